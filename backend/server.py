@@ -1,21 +1,35 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Request, Response, Depends
+from fastapi import FastAPI, APIRouter, BackgroundTasks, HTTPException, Request, Response, Depends
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne
+from bson.codec_options import CodecOptions
+from pymongo.errors import DuplicateKeyError
+from cachetools import TTLCache
+from openai import AsyncOpenAI
+from aiolimiter import AsyncLimiter
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from tenacity import AsyncRetrying, stop_after_attempt, wait_exponential_jitter, retry_if_result
 import os
 import logging
 import re
 from pathlib import Path
+from functools import lru_cache
+from itertools import islice
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
 from typing import List, Optional, Dict
 import uuid
 from datetime import datetime, timezone, timedelta
 import httpx
-import json
+import orjson
 import time
 import hashlib
+import heapq
+import hmac
 import secrets
-import math
+import numpy as np
 import asyncio
 
 ROOT_DIR = Path(__file__).parent
@@ -24,10 +38,12 @@ load_dotenv(ROOT_DIR / '.env')
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Dates are stored as native BSON datetimes and decoded as timezone-aware UTC, so they
+# serialize with an explicit offset and compare directly against datetime.now(timezone.utc)
+db = client.get_database(os.environ['DB_NAME'], codec_options=CodecOptions(tz_aware=True))
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -41,9 +57,17 @@ logger = logging.getLogger(__name__)
 
 # ============== CONSTANTS ==============
 SESSION_EXPIRY_DAYS = 7
+SESSION_CACHE_TTL_SECONDS = 60  # How long a validated session is trusted without a DB lookup
+ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM = 2, 19456, 1  # Password hashing cost (memory in KiB)
 CACHE_TTL_SECONDS = 600  # 10 minutes for posts and comments
+CACHE_STALE_SECONDS = 600  # Extra time expired posts are kept to serve while refreshing
+CACHE_PURGE_INTERVAL_SECONDS = 60  # How often expired cache entries are evicted
 THROTTLE_SECONDS = 30  # Minimum time between scans
-COMMENT_FETCH_DELAY = 0.2  # 200ms delay between comment fetches
+MAX_CONCURRENT_SCANS_PER_USER = 2  # In-flight scans allowed per user before returning 429
+ARCTIC_SHIFT_CONCURRENCY = 8  # Max in-flight requests to Arctic Shift
+ARCTIC_SHIFT_RATE_PER_MINUTE = 60  # Shared request budget for Arctic Shift
+ARCTIC_SHIFT_MAX_ATTEMPTS = 4  # Tries per request when Arctic Shift is throttling or unavailable
+ARCTIC_SHIFT_MAX_RETRY_WAIT = 8  # Cap in seconds on any single backoff, including Retry-After
 TOP_POSTS_FOR_COMMENTS = 15  # Fetch comments for top N posts
 MAX_COMMENTS_PER_POST = 10  # Keep up to N comments per post
 COMMENT_BODY_TRUNCATE = 400  # Max chars per comment body
@@ -52,10 +76,51 @@ MAX_POSTS_FINAL = 100  # Max posts after filtering (Arctic Shift API limit)
 MAX_POSTS_PER_AUTHOR = 3  # Diversity cap
 MAX_NO_COMMENT_POSTS = 20  # Diversity cap for 0-comment posts
 MIN_RECENT_POSTS = 20  # Try to include at least N posts from last 3 days
+AI_MODEL = "gpt-4o-mini"
+AI_CACHE_TTL_SECONDS = 3600  # 1 hour for AI analysis results
+SENTIMENT_MAP = {"Positive": 1, "Mixed": 0, "Negative": -1, "Unknown": 0}  # Numeric sentiment for trend charts
 
 # ============== IN-MEMORY CACHE ==============
-reddit_cache: Dict[str, dict] = {}
-comments_cache: Dict[str, dict] = {}  # Cache for comments by post_id
+# Bounded LRU + TTL caches; all access happens on the event loop thread so no locking is needed.
+# Posts entries outlive CACHE_TTL_SECONDS by the stale grace period and carry their own timestamp.
+reddit_cache = TTLCache(maxsize=1024, ttl=CACHE_TTL_SECONDS + CACHE_STALE_SECONDS)
+comments_cache = TTLCache(maxsize=10_000, ttl=CACHE_TTL_SECONDS)  # Comments by post_id
+reddit_inflight: Dict[str, asyncio.Task] = {}  # In-flight posts cache refreshes by subreddit
+ai_cache = TTLCache(maxsize=1024, ttl=AI_CACHE_TTL_SECONDS)  # AI analysis results by content key
+# Validated sessions are per-process: running more than one worker needs sticky sessions
+# or a shared invalidation channel, otherwise a revoked session lives on elsewhere until its TTL
+session_cache = TTLCache(maxsize=10_000, ttl=SESSION_CACHE_TTL_SECONDS)  # (User, expires_at) by session_token
+session_tokens_by_user = TTLCache(maxsize=10_000, ttl=SESSION_CACHE_TTL_SECONDS)  # Cached tokens by user_id
+
+# ============== SHARED CACHE ==============
+# Mongo-backed second level behind the in-memory caches, so cached data is shared between
+# workers and survives restarts. A TTL index on expires_at lets Mongo drop old entries.
+
+async def load_shared_cache(key: str) -> Optional[tuple[dict, float]]:
+    """Return (data, age_seconds) for a live shared cache entry, or None"""
+    try:
+        entry = await db.cache_entries.find_one(
+            {"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}},
+            {"_id": 0, "data": 1, "cached_at": 1}
+        )
+    except Exception as e:
+        logger.warning(f"Shared cache read failed for {key}: {e}")
+        return None
+    if not entry:
+        return None
+    return entry["data"], (datetime.now(timezone.utc) - entry["cached_at"]).total_seconds()
+
+async def store_shared_cache(key: str, data: dict, ttl_seconds: int):
+    """Write a shared cache entry; failures only cost a cache miss elsewhere"""
+    cached_at = datetime.now(timezone.utc)
+    try:
+        await db.cache_entries.replace_one(
+            {"_id": key},
+            {"data": data, "cached_at": cached_at, "expires_at": cached_at + timedelta(seconds=ttl_seconds)},
+            upsert=True
+        )
+    except Exception as e:
+        logger.warning(f"Shared cache write failed for {key}: {e}")
 
 # ============== AUTH MODELS ==============
 
@@ -94,6 +159,17 @@ class TrackedGame(BaseModel):
     keywords: Optional[str] = ""
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+# TrackedGame's fields, with its defaults for documents saved before a field existed
+TRACKED_GAME_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "user_id": 1,
+    "name": 1,
+    "subreddit": 1,
+    "keywords": {"$ifNull": ["$keywords", ""]},
+    "created_at": {"$ifNull": ["$created_at", "$$NOW"]}
+}
+
 class TrackedGameCreate(BaseModel):
     name: str
     subreddit: str
@@ -138,24 +214,50 @@ class ScanResult(BaseModel):
 
 # ============== PASSWORD HASHING ==============
 
+# argon2id via the C bindings, which release the GIL while hashing
+password_hasher = PasswordHasher(time_cost=ARGON2_TIME_COST, memory_cost=ARGON2_MEMORY_COST, parallelism=ARGON2_PARALLELISM)
+
 def hash_password(password: str) -> str:
-    """Hash password with salt using SHA-256"""
-    salt = secrets.token_hex(16)
-    hashed = hashlib.sha256((password + salt).encode()).hexdigest()
-    return f"{salt}:{hashed}"
+    """Hash password with argon2id"""
+    return password_hasher.hash(password)
 
 def verify_password(password: str, stored_hash: str) -> bool:
-    """Verify password against stored hash"""
+    """Verify password against stored hash (argon2id, or legacy salted SHA-256)"""
     try:
+        if stored_hash.startswith("$argon2"):
+            return password_hasher.verify(stored_hash, password)
         salt, hashed = stored_hash.split(":")
-        return hashlib.sha256((password + salt).encode()).hexdigest() == hashed
-    except (ValueError, AttributeError):
+        return hmac.compare_digest(hashlib.sha256((password + salt).encode()).hexdigest(), hashed)
+    except (VerificationError, InvalidHashError, ValueError, AttributeError):
         return False
 
+def password_needs_rehash(stored_hash: str) -> bool:
+    """True for legacy hashes and argon2 hashes made with other parameters"""
+    if not stored_hash.startswith("$argon2"):
+        return True
+    return password_hasher.check_needs_rehash(stored_hash)
+
 # ============== AUTH HELPERS ==============
 
+# Only the fields needed to validate a session and build a User
+USER_FIELDS = ("user_id", "email", "name", "picture", "auth_provider", "created_at")
+
+def session_auth_pipeline(session_token: str) -> List[dict]:
+    """Session and its user in one round-trip, instead of two find_one calls"""
+    return [
+        {"$match": {"session_token": session_token}},
+        {"$limit": 1},
+        {"$lookup": {"from": "users", "localField": "user_id", "foreignField": "user_id", "as": "user"}},
+        {"$project": {"_id": 0, "expires_at": 1, "user": {"$arrayElemAt": ["$user", 0]}}},
+        {"$project": {"expires_at": 1, **{f"user.{field}": 1 for field in USER_FIELDS}}}
+    ]
+
 async def get_current_user(request: Request) -> User:
     """Extract and validate user from session token (cookie or header)"""
+    # Already resolved for this request
+    if hasattr(request.state, "user"):
+        return request.state.user
+    
     # Try cookie first
     session_token = request.cookies.get("session_token")
     
@@ -168,49 +270,58 @@ async def get_current_user(request: Request) -> User:
     if not session_token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    # Find session
-    session_doc = await db.user_sessions.find_one(
-        {"session_token": session_token},
-        {"_id": 0}
-    )
+    # Serve recently validated sessions without touching Mongo
+    cached = session_cache.get(session_token)
+    if cached:
+        user, expires_at = cached
+        if expires_at >= datetime.now(timezone.utc):
+            request.state.user, request.state.session_token = user, session_token
+            return user
     
-    if not session_doc:
+    # Find session and user
+    session_docs = await db.user_sessions.aggregate(session_auth_pipeline(session_token)).to_list(1)
+    
+    if not session_docs:
         raise HTTPException(status_code=401, detail="Invalid session")
+    session_doc = session_docs[0]
     
-    # Check expiry with timezone handling
+    # Check expiry
     expires_at = session_doc["expires_at"]
-    if isinstance(expires_at, str):
-        expires_at = datetime.fromisoformat(expires_at)
-    if expires_at.tzinfo is None:
-        expires_at = expires_at.replace(tzinfo=timezone.utc)
     if expires_at < datetime.now(timezone.utc):
         raise HTTPException(status_code=401, detail="Session expired")
     
-    # Find user
-    user_doc = await db.users.find_one(
-        {"user_id": session_doc["user_id"]},
-        {"_id": 0}
-    )
-    
+    user_doc = session_doc.get("user")
     if not user_doc:
         raise HTTPException(status_code=401, detail="User not found")
     
-    # Handle datetime
-    if isinstance(user_doc.get('created_at'), str):
-        user_doc['created_at'] = datetime.fromisoformat(user_doc['created_at'])
-    
-    return User(**user_doc)
+    user = User(**user_doc)
+    session_cache[session_token] = (user, expires_at)
+    # Re-set so the index entry never expires before the session entry it points to
+    session_tokens_by_user[user.user_id] = session_tokens_by_user.get(user.user_id, set()) | {session_token}
+    request.state.user, request.state.session_token = user, session_token
+    return user
+
+def evict_cached_sessions(user_id: str, keep_token: Optional[str] = None):
+    """Drop a user's sessions from the session cache, optionally keeping one"""
+    tokens = session_tokens_by_user.pop(user_id, set())
+    for token in tokens:
+        if token != keep_token:
+            session_cache.pop(token, None)
+    if keep_token in tokens and keep_token in session_cache:
+        session_tokens_by_user[user_id] = {keep_token}
 
 async def create_session(user_id: str, response: Response) -> str:
     """Create a new session for a user"""
     session_token = secrets.token_urlsafe(32)
-    expires_at = datetime.now(timezone.utc) + timedelta(days=SESSION_EXPIRY_DAYS)
+    created_at = datetime.now(timezone.utc)
+    expires_at = created_at + timedelta(days=SESSION_EXPIRY_DAYS)
     
+    # Native datetimes, so the TTL index on expires_at can purge expired sessions
     session = {
         "user_id": user_id,
         "session_token": session_token,
-        "expires_at": expires_at.isoformat(),
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "expires_at": expires_at,
+        "created_at": created_at
     }
     
     await db.user_sessions.insert_one(session)
@@ -230,12 +341,15 @@ async def create_session(user_id: str, response: Response) -> str:
 
 # ============== SUBREDDIT NORMALIZATION ==============
 
+SUBREDDIT_URL_RE = re.compile(r'(?:https?://)?(?:www\.)?reddit\.com/r/([^/\s?]+)', re.IGNORECASE)
+USER_MENTION_RE = re.compile(r'/?u/[A-Za-z0-9_-]+')
+
+@lru_cache(maxsize=4096)
 def normalize_subreddit(input_str: str) -> str:
     if not input_str:
         return ""
     normalized = input_str.strip()
-    url_pattern = r'(?:https?://)?(?:www\.)?reddit\.com/r/([^/\s?]+)'
-    url_match = re.match(url_pattern, normalized, re.IGNORECASE)
+    url_match = SUBREDDIT_URL_RE.match(normalized)
     if url_match:
         return url_match.group(1)
     if normalized.lower().startswith('r/'):
@@ -243,97 +357,151 @@ def normalize_subreddit(input_str: str) -> str:
     normalized = normalized.rstrip('/')
     return normalized
 
+@lru_cache(maxsize=4096)
+def subreddit_key(input_str: str) -> str:
+    """Case-insensitive key for per-subreddit state (posts cache, throttle)"""
+    return normalize_subreddit(input_str).lower()
+
 # ============== ARCTIC SHIFT FETCHING ==============
 
 ARCTIC_SHIFT_BASE = "https://arctic-shift.photon-reddit.com"
 
-async def fetch_arctic_shift_posts(subreddit: str, after: str, before: str) -> tuple[List[dict], Optional[int], Optional[str]]:
+# Shared per-host cap on concurrent Arctic Shift requests, plus a request rate budget
+arctic_shift_semaphore = asyncio.Semaphore(ARCTIC_SHIFT_CONCURRENCY)
+arctic_shift_limiter = AsyncLimiter(ARCTIC_SHIFT_RATE_PER_MINUTE, 60)
+
+# Throttling and gateway errors are retried with jittered exponential backoff
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+arctic_shift_backoff = wait_exponential_jitter(initial=0.5, max=ARCTIC_SHIFT_MAX_RETRY_WAIT)
+
+# Shared HTTP client so connections (and HTTP/2 streams) are reused across requests
+http_client = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60),
+    timeout=httpx.Timeout(30.0, connect=5.0),
+    headers={
+        "User-Agent": "SentientTrackerMVP/1.0",
+        "Accept": "application/json"
+    },
+    follow_redirects=True
+)
+
+def arctic_shift_retry_wait(retry_state) -> float:
+    """Honor a numeric Retry-After header, otherwise back off exponentially with jitter"""
+    retry_after = retry_state.outcome.result().headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return min(float(retry_after), ARCTIC_SHIFT_MAX_RETRY_WAIT)
+    return arctic_shift_backoff(retry_state)
+
+async def arctic_shift_get(url: str, **kwargs) -> httpx.Response:
+    """
+    GET from Arctic Shift within the shared rate budget, retrying 429/502/503/504.
+    Returns the last response once attempts run out, so callers still see its status.
+    """
+    async def get_once() -> httpx.Response:
+        async with arctic_shift_limiter:
+            return await http_client.get(url, **kwargs)
+    
+    retrying = AsyncRetrying(
+        stop=stop_after_attempt(ARCTIC_SHIFT_MAX_ATTEMPTS),
+        wait=arctic_shift_retry_wait,
+        retry=retry_if_result(lambda r: r.status_code in RETRYABLE_STATUSES),
+        retry_error_callback=lambda retry_state: retry_state.outcome.result()
+    )
+    return await retrying(get_once)
+
+async def fetch_arctic_shift_posts(subreddit: str, after: str, before: str) -> tuple[List[dict], int, Optional[int], Optional[str]]:
     """
     Fetch posts from Arctic Shift API with relative date formats.
     after/before use relative formats like "8d", "36h", "12h", "0h"
     Arctic Shift API has a limit of 100 posts per request.
+    Low-quality posts are dropped while parsing and selftext is truncated to
+    POST_SELFTEXT_TRUNCATE, so only survivors are materialized.
+    Returns: (posts, raw_post_count, status, error)
     """
     fields = "id,title,selftext,created_utc,score,num_comments,author"
     url = f"{ARCTIC_SHIFT_BASE}/api/posts/search?subreddit={subreddit}&after={after}&before={before}&sort=desc&limit=100&fields={fields}"
     
-    headers = {
-        "User-Agent": "SentientTrackerMVP/1.0",
-        "Accept": "application/json"
-    }
-    
     try:
-        async with httpx.AsyncClient(timeout=30.0) as http_client:
-            response = await http_client.get(url, headers=headers, follow_redirects=True)
-            status = response.status_code
-            
-            # Parse retry-after header if rate limited
-            retry_after = response.headers.get("Retry-After")
-            
-            if status == 404:
-                return [], status, "Subreddit not found. Check spelling."
-            elif status == 429:
-                retry_msg = f" (retry after {retry_after}s)" if retry_after else ""
-                return [], status, f"Rate limited{retry_msg}. Try again later."
-            elif status == 403:
-                return [], status, "Access forbidden."
-            elif status == 400:
-                try:
-                    error_data = response.json()
-                    logger.warning(f"Arctic Shift 400 error: {error_data.get('error', 'Unknown')}")
-                except (json.JSONDecodeError, Exception):
-                    pass
-                return [], status, "Bad request. Check subreddit name."
-            elif status == 502 or status == 503:
-                return [], status, "Arctic Shift service temporarily unavailable. Try again later."
-            elif status == 504:
-                return [], status, "Request timed out. Try reducing the time window."
-            elif status != 200:
-                return [], status, f"Arctic Shift returned HTTP {status}."
-            
+        response = await arctic_shift_get(url)
+        status = response.status_code
+        
+        # Parse retry-after header if rate limited
+        retry_after = response.headers.get("Retry-After")
+        
+        if status == 404:
+            return [], 0, status, "Subreddit not found. Check spelling."
+        elif status == 429:
+            retry_msg = f" (retry after {retry_after}s)" if retry_after else ""
+            return [], 0, status, f"Rate limited{retry_msg}. Try again later."
+        elif status == 403:
+            return [], 0, status, "Access forbidden."
+        elif status == 400:
             try:
-                data = response.json()
-            except json.JSONDecodeError:
-                return [], status, "Invalid JSON response from Arctic Shift."
+                error_data = orjson.loads(response.content)
+                logger.warning(f"Arctic Shift 400 error: {error_data.get('error', 'Unknown')}")
+            except (orjson.JSONDecodeError, Exception):
+                pass
+            return [], 0, status, "Bad request. Check subreddit name."
+        elif status == 502 or status == 503:
+            return [], 0, status, "Arctic Shift service temporarily unavailable. Try again later."
+        elif status == 504:
+            return [], 0, status, "Request timed out. Try reducing the time window."
+        elif status != 200:
+            return [], 0, status, f"Arctic Shift returned HTTP {status}."
+        
+        try:
+            data = orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            return [], 0, status, "Invalid JSON response from Arctic Shift."
+        
+        if not isinstance(data, dict):
+            return [], 0, status, "Unexpected response format."
+        
+        posts_data = data.get("data", [])
+        if not isinstance(posts_data, list):
+            return [], 0, status, "Unexpected response. 'data' is not an array."
+        
+        posts = []
+        for post_data in posts_data:
+            if not isinstance(post_data, dict):
+                continue
             
-            if not isinstance(data, dict):
-                return [], status, "Unexpected response format."
+            post_id = post_data.get("id", "")
+            if not post_id:
+                continue
             
-            posts_data = data.get("data", [])
-            if not isinstance(posts_data, list):
-                return [], status, "Unexpected response. 'data' is not an array."
+            title = post_data.get("title", "") or ""
+            selftext = post_data.get("selftext", "") or ""
+            score = post_data.get("score", 0) or 0
+            num_comments = post_data.get("num_comments", 0) or 0
             
-            posts = []
-            for post_data in posts_data:
-                if not isinstance(post_data, dict):
-                    continue
-                
-                post_id = post_data.get("id", "")
-                if not post_id:
-                    continue
-                
-                # Construct permalink from post ID
-                permalink = f"https://www.reddit.com/comments/{post_id}"
-                
-                posts.append({
-                    "id": post_id,
-                    "title": post_data.get("title", "") or "",
-                    "selftext": post_data.get("selftext", "") or "",
-                    "score": post_data.get("score", 0) or 0,
-                    "created_utc": post_data.get("created_utc", 0) or 0,
-                    "num_comments": post_data.get("num_comments", 0) or 0,
-                    "author": post_data.get("author", "") or "",
-                    "permalink": permalink
-                })
+            if is_low_quality_post(title, selftext, score, num_comments):
+                continue
             
-            return posts, status, None
+            # Construct permalink from post ID
+            permalink = f"https://www.reddit.com/comments/{post_id}"
             
+            posts.append({
+                "id": post_id,
+                "title": title,
+                "selftext": selftext[:POST_SELFTEXT_TRUNCATE],
+                "score": score,
+                "created_utc": post_data.get("created_utc", 0) or 0,
+                "num_comments": num_comments,
+                "author": post_data.get("author", "") or "",
+                "permalink": permalink
+            })
+        
+        return posts, len(posts_data), status, None
+        
     except httpx.TimeoutException:
-        return [], None, "Request timed out. Try again or reduce time window."
+        return [], 0, None, "Request timed out. Try again or reduce time window."
     except httpx.ConnectError:
-        return [], None, "Could not connect to Arctic Shift. Check connection."
+        return [], 0, None, "Could not connect to Arctic Shift. Check connection."
     except Exception as e:
         logger.error(f"Error fetching Arctic Shift posts: {e}")
-        return [], None, f"Network error: {str(e)}"
+        return [], 0, None, f"Network error: {str(e)}"
 
 
 async def fetch_arctic_shift_comments(post_id: str) -> tuple[List[dict], Optional[str]]:
@@ -341,133 +509,115 @@ async def fetch_arctic_shift_comments(post_id: str) -> tuple[List[dict], Optiona
     Fetch top-level comments for a post from Arctic Shift API.
     """
     # Check cache first
-    current_time = time.time()
     cache_key = f"comments_{post_id}"
-    
-    if cache_key in comments_cache:
-        cache_entry = comments_cache[cache_key]
-        if current_time - cache_entry["timestamp"] < CACHE_TTL_SECONDS:
-            return cache_entry["data"], None
+    cached_comments = comments_cache.get(cache_key)
+    if cached_comments is not None:
+        return cached_comments, None
     
     fields = "id,body,created_utc,score,author,link_id,parent_id"
     url = f"{ARCTIC_SHIFT_BASE}/api/comments/search?link_id=t3_{post_id}&sort=desc&limit=100&fields={fields}"
     
-    headers = {
-        "User-Agent": "SentientTrackerMVP/1.0",
-        "Accept": "application/json"
-    }
-    
     try:
-        async with httpx.AsyncClient(timeout=15.0) as http_client:
-            response = await http_client.get(url, headers=headers, follow_redirects=True)
-            
-            if response.status_code != 200:
-                return [], f"Failed to fetch comments (HTTP {response.status_code})"
-            
-            data = response.json()
-            comments_data = data.get("data", [])
+        response = await arctic_shift_get(url, timeout=15.0)
+        
+        if response.status_code != 200:
+            return [], f"Failed to fetch comments (HTTP {response.status_code})"
+        
+        data = orjson.loads(response.content)
+        comments_data = data.get("data", [])
+        
+        # Filter to top-level comments only (parent_id starts with t3_ or is empty)
+        comments = []
+        for c in comments_data:
+            if not isinstance(c, dict):
+                continue
             
-            # Filter to top-level comments only (parent_id starts with t3_ or is empty)
-            comments = []
-            for c in comments_data:
-                if not isinstance(c, dict):
-                    continue
-                
-                parent_id = c.get("parent_id", "")
-                # Top-level comments have parent_id = t3_<post_id> (the post itself)
-                # or sometimes no parent_id at all
-                if parent_id and not parent_id.startswith("t3_"):
-                    continue  # Skip replies to other comments
-                
-                body = c.get("body", "") or ""
-                # Skip deleted/removed comments
-                if body in ["[deleted]", "[removed]", ""]:
-                    continue
-                
-                comments.append({
-                    "id": c.get("id", ""),
-                    "body": body,
-                    "score": c.get("score", 0) or 0,
-                    "created_utc": c.get("created_utc", 0) or 0,
-                    "author": c.get("author", "") or ""
-                })
+            parent_id = c.get("parent_id", "")
+            # Top-level comments have parent_id = t3_<post_id> (the post itself)
+            # or sometimes no parent_id at all
+            if parent_id and not parent_id.startswith("t3_"):
+                continue  # Skip replies to other comments
             
-            # Cache the results
-            comments_cache[cache_key] = {
-                "data": comments,
-                "timestamp": current_time
-            }
+            body = c.get("body", "") or ""
+            # Skip deleted/removed comments
+            if body in ["[deleted]", "[removed]", ""]:
+                continue
             
-            return comments, None
+            # Truncate and anonymize before caching so the cache only holds what the prompt uses;
+            # the original length is kept because comment selection ranks on it
+            body_length = len(body)
+            if len(body) > COMMENT_BODY_TRUNCATE:
+                body = body[:COMMENT_BODY_TRUNCATE] + "..."
+            body = USER_MENTION_RE.sub('[user]', body)
             
+            comments.append({
+                "id": c.get("id", ""),
+                "body": body,
+                "body_length": body_length,
+                "score": c.get("score", 0) or 0,
+                "created_utc": c.get("created_utc", 0) or 0,
+                "author": c.get("author", "") or ""
+            })
+        
+        # Cache the results
+        comments_cache[cache_key] = comments
+        
+        return comments, None
+        
     except Exception as e:
         logger.error(f"Error fetching comments for post {post_id}: {e}")
         return [], str(e)
 
 
-def apply_quality_filter(posts: List[dict]) -> List[dict]:
+def is_low_quality_post(title: str, selftext: str, score: int, num_comments: int) -> bool:
     """
-    Drop low-quality posts:
-    - num_comments == 0 AND score <= 1 AND (selftext empty OR < 80 chars) AND title < 25 chars
+    Quality filter applied while parsing Arctic Shift posts:
+    num_comments == 0 AND score <= 1 AND (selftext empty OR < 80 chars) AND title < 25 chars
     """
-    filtered = []
-    for post in posts:
-        num_comments = post.get("num_comments", 0)
-        score = post.get("score", 0)
-        selftext = post.get("selftext", "") or ""
-        title = post.get("title", "") or ""
-        
-        # Quality filter condition
-        is_low_quality = (
-            num_comments == 0 and
-            score <= 1 and
-            (len(selftext) == 0 or len(selftext) < 80) and
-            len(title) < 25
-        )
-        
-        if not is_low_quality:
-            filtered.append(post)
-    
-    return filtered
+    return (
+        num_comments == 0 and
+        score <= 1 and
+        len(selftext) < 80 and
+        len(title) < 25
+    )
 
 
-def calculate_post_rank(post: dict) -> float:
+def calculate_post_ranks(posts: List[dict]) -> np.ndarray:
     """
-    Calculate ranking score for a post:
+    Calculate ranking scores for posts, vectorized over the whole list:
     engagement = ln(score+1) + 2*ln(num_comments+1)
     text_bonus = min(len(selftext)/500, 1)
     total_rank = engagement + 0.35*text_bonus
+    Returns a float array aligned with posts.
     """
-    score = max(0, post.get("score", 0))
-    num_comments = max(0, post.get("num_comments", 0))
-    selftext = post.get("selftext", "") or ""
+    count = len(posts)
+    scores = np.fromiter((max(0, p.get("score", 0)) for p in posts), dtype=np.float64, count=count)
+    num_comments = np.fromiter((max(0, p.get("num_comments", 0)) for p in posts), dtype=np.float64, count=count)
+    text_lengths = np.fromiter((len(p.get("selftext", "") or "") for p in posts), dtype=np.float64, count=count)
     
-    engagement = math.log(score + 1) + 2 * math.log(num_comments + 1)
-    text_bonus = min(len(selftext) / 500, 1.0)
-    total_rank = engagement + 0.35 * text_bonus
-    
-    return total_rank
+    engagement = np.log1p(scores) + 2 * np.log1p(num_comments)
+    text_bonus = np.minimum(text_lengths / 500, 1.0)
+    return engagement + 0.35 * text_bonus
 
 
-def apply_diversity_and_recency(posts: List[dict]) -> List[dict]:
+def apply_diversity_and_recency(posts: List[dict], now: float) -> tuple[List[dict], Dict[str, float]]:
     """
     Apply diversity caps and ensure recency:
     - Max 3 posts per author
     - Max 25 posts with num_comments == 0
     - Try to include at least 30 posts from last 3 days
+    now is the scan's wall-clock time (epoch seconds) used for the recency window.
+    Returns: (selected_posts, ranks_by_id) so callers can reuse the ranks
     """
-    # Sort by rank
-    for post in posts:
-        post["_rank"] = calculate_post_rank(post)
-    
-    posts_sorted = sorted(posts, key=lambda p: p["_rank"], reverse=True)
+    # Sort by rank (stable, so ties keep their fetch order)
+    ranks = calculate_post_ranks(posts)
+    posts_sorted = [posts[i] for i in np.argsort(-ranks, kind="stable")]
     
     # Track diversity constraints
     author_count: Dict[str, int] = {}
     no_comment_count = 0
     
-    # Current time for recency check
-    now = time.time()
+    # Recency window relative to the scan time
     three_days_ago = now - (3 * 24 * 60 * 60)
     
     # First pass: select posts while respecting diversity caps
@@ -524,39 +674,28 @@ def apply_diversity_and_recency(posts: List[dict]) -> List[dict]:
                 selected.append(post)
                 recent_in_selection += 1
     
-    # Clean up temporary rank field
-    for post in selected:
-        post.pop("_rank", None)
-    
-    return selected[:MAX_POSTS_FINAL]
+    ranks_by_id = dict(zip((post.get("id", "") for post in posts), ranks.tolist()))
+    return selected[:MAX_POSTS_FINAL], ranks_by_id
 
 
 def select_best_comments(comments: List[dict], max_count: int = MAX_COMMENTS_PER_POST) -> List[dict]:
     """
     Select best comments, preferring higher score, then longer body, then more recent.
-    Truncate body and remove usernames.
+    Bodies are already truncated and anonymized by fetch_arctic_shift_comments, so length
+    comes from the untruncated body_length it records.
     """
-    # Sort by score (desc), then body length (desc), then created_utc (desc)
-    sorted_comments = sorted(
+    # Top N by score (desc), then original body length (desc), then created_utc (desc)
+    top_comments = heapq.nlargest(
+        max_count,
         comments,
-        key=lambda c: (c.get("score", 0), len(c.get("body", "")), c.get("created_utc", 0)),
-        reverse=True
+        key=lambda c: (c.get("score", 0), c.get("body_length", len(c.get("body", ""))), c.get("created_utc", 0))
     )
     
     selected = []
-    for c in sorted_comments[:max_count]:
-        body = c.get("body", "")
-        # Truncate body
-        if len(body) > COMMENT_BODY_TRUNCATE:
-            body = body[:COMMENT_BODY_TRUNCATE] + "..."
-        
-        # Remove specific usernames (replace /u/username patterns)
-        import re
-        body = re.sub(r'/?u/[A-Za-z0-9_-]+', '[user]', body)
-        
+    for c in top_comments:
         selected.append({
             "id": c.get("id", ""),
-            "body": body,
+            "body": c.get("body", ""),
             "score": c.get("score", 0)
         })
     
@@ -580,19 +719,63 @@ async def fetch_reddit_posts(subreddit: str) -> tuple[List[dict], List[dict], Op
         data_source="arctic-shift"
     )
     
-    current_time = time.time()
     subreddit_lower = normalized.lower()
     
     # Check posts cache first
-    if subreddit_lower in reddit_cache:
-        cache_entry = reddit_cache[subreddit_lower]
-        cache_age = current_time - cache_entry["timestamp"]
-        
-        if cache_age < CACHE_TTL_SECONDS:
-            logger.info(f"Using cached data for r/{normalized} (age: {cache_age:.0f}s)")
-            debug.error_details = f"Using cached data (age: {int(cache_age)}s)"
-            cached_data = cache_entry["data"]
-            return cached_data["posts"], cached_data.get("comments", []), None, True, debug
+    cache_entry = await get_posts_cache_entry(subreddit_lower)
+    if cache_entry and time.monotonic() - cache_entry["timestamp"] < CACHE_TTL_SECONDS:
+        return cached_posts_result(normalized, cache_entry, debug)
+    
+    # Stampede protection: concurrent callers share a single in-flight refresh
+    # per subreddit, and get the stale entry instead of waiting when there is one
+    refresh_task = reddit_inflight.get(subreddit_lower)
+    if refresh_task is None:
+        refresh_task = asyncio.create_task(refresh_reddit_posts(normalized, debug))
+        reddit_inflight[subreddit_lower] = refresh_task
+        refresh_task.add_done_callback(lambda _: reddit_inflight.pop(subreddit_lower, None))
+    elif cache_entry:
+        return cached_posts_result(normalized, cache_entry, debug)
+    
+    # Shielded so one caller disconnecting doesn't cancel the fetch for everyone else
+    posts, comments, error, cached, task_debug = await asyncio.shield(refresh_task)
+    # Coalesced callers all get the task's DebugInfo, so hand each one its own copy
+    return posts, comments, error, cached, task_debug.model_copy()
+
+
+async def get_posts_cache_entry(subreddit_lower: str) -> Optional[dict]:
+    """Posts cache entry from memory, falling back to (and repopulating from) the shared cache"""
+    cache_entry = reddit_cache.get(subreddit_lower)
+    if cache_entry is None:
+        shared = await load_shared_cache(f"reddit:{subreddit_lower}")
+        if shared:
+            data, cache_age = shared
+            cache_entry = {"data": data, "timestamp": time.monotonic() - cache_age}
+            reddit_cache[subreddit_lower] = cache_entry
+    return cache_entry
+
+
+def cached_posts_result(normalized: str, cache_entry: dict, debug: DebugInfo) -> tuple[List[dict], List[dict], Optional[str], bool, DebugInfo]:
+    """Build the fetch_reddit_posts return value from a posts cache entry"""
+    cache_age = time.monotonic() - cache_entry["timestamp"]
+    if cache_age < CACHE_TTL_SECONDS:
+        logger.info(f"Using cached data for r/{normalized} (age: {cache_age:.0f}s)")
+        debug.error_details = f"Using cached data (age: {int(cache_age)}s)"
+    else:
+        logger.info(f"Using stale cached data for r/{normalized} while refresh is in progress (age: {cache_age:.0f}s)")
+        debug.error_details = f"Using stale cached data while refresh is in progress (age: {int(cache_age)}s)"
+    cached_data = cache_entry["data"]
+    return cached_data["posts"], cached_data.get("comments", []), None, True, debug
+
+
+async def refresh_reddit_posts(normalized: str, debug: DebugInfo) -> tuple[List[dict], List[dict], Optional[str], bool, DebugInfo]:
+    """
+    Fetch posts and top-post comments from Arctic Shift and store them in the posts cache.
+    Returns the same tuple as fetch_reddit_posts.
+    """
+    # Monotonic clock for cache age, wall clock for comparing against post timestamps
+    current_time = time.monotonic()
+    now = time.time()
+    subreddit_lower = normalized.lower()
     
     # Try different time windows: 8d..36h, then 8d..12h, then 8d..0h
     windows = [
@@ -601,28 +784,30 @@ async def fetch_reddit_posts(subreddit: str) -> tuple[List[dict], List[dict], Op
         ("8d", "0h")
     ]
     
+    async def fetch_window(after: str, before: str) -> tuple[List[dict], int, Optional[int], Optional[str]]:
+        async with arctic_shift_semaphore:
+            return await fetch_arctic_shift_posts(normalized, after, before)
+    
+    # Fetch every window concurrently, then pick one in preference order
+    results = await asyncio.gather(*(fetch_window(after, before) for after, before in windows))
+    
     posts = []
     used_window = ""
+    fetch_error = None
     
-    for after, before in windows:
+    for (after, before), (filtered_posts, raw_post_count, status, error) in zip(windows, results):
         window_str = f"{after}..{before}"
         url = f"{ARCTIC_SHIFT_BASE}/api/posts/search?subreddit={normalized}&after={after}&before={before}&sort=desc&limit=500"
         debug.posts_url = url
-        
-        fetched_posts, status, error = await fetch_arctic_shift_posts(normalized, after, before)
         debug.posts_status = status
         
         if error:
+            # A failed window (even rate limited) doesn't sink the scan if another window succeeded
             debug.error_details = error
-            # If it's a rate limit or server error, don't try other windows
-            if status in [429, 502, 503, 504]:
-                return [], [], error, False, debug
+            fetch_error = fetch_error or error
             continue
         
-        debug.raw_post_count = len(fetched_posts)
-        
-        # Apply quality filter
-        filtered_posts = apply_quality_filter(fetched_posts)
+        debug.raw_post_count = raw_post_count
         debug.after_quality_filter = len(filtered_posts)
         
         # Check if we have enough posts
@@ -633,16 +818,19 @@ async def fetch_reddit_posts(subreddit: str) -> tuple[List[dict], List[dict], Op
         elif len(filtered_posts) > len(posts):
             posts = filtered_posts
             used_window = window_str
-            # Continue to try wider windows if we don't have enough
+            # Continue to consider wider windows if we don't have enough
     
     debug.window_used = used_window
     
     if not posts:
+        if all(error for _, _, _, error in results):
+            # Every window failed, so report the upstream error rather than "no posts"
+            return [], [], fetch_error, False, debug
         debug.error_details = "No posts found in any time window"
         return [], [], f"No posts found for r/{normalized}. The subreddit may be empty, private, or the name may be incorrect.", False, debug
     
     # Apply diversity and recency rules
-    final_posts = apply_diversity_and_recency(posts)
+    final_posts, ranks_by_id = apply_diversity_and_recency(posts, now=now)
     debug.final_post_count = len(final_posts)
     
     logger.info(f"Fetched {len(final_posts)} posts for r/{normalized} (window: {used_window})")
@@ -650,51 +838,67 @@ async def fetch_reddit_posts(subreddit: str) -> tuple[List[dict], List[dict], Op
     # Fetch comments for top 15 posts
     post_comments = []
     
-    # Re-rank to get top posts for comment fetching
-    ranked_for_comments = sorted(final_posts, key=calculate_post_rank, reverse=True)[:TOP_POSTS_FOR_COMMENTS]
+    # Re-rank to get top posts for comment fetching, reusing the ranks computed above
+    ranked_for_comments = heapq.nlargest(TOP_POSTS_FOR_COMMENTS, final_posts, key=lambda p: ranks_by_id[p.get("id", "")])
+    
+    async def fetch_bounded(post_id: str) -> tuple[List[dict], Optional[str]]:
+        async with arctic_shift_semaphore:
+            return await fetch_arctic_shift_comments(post_id)
+    
+    posts_to_fetch = [post for post in ranked_for_comments if post.get("id")]
+    results = await asyncio.gather(
+        *(fetch_bounded(post["id"]) for post in posts_to_fetch),
+        return_exceptions=True
+    )
     
+    # gather preserves input order, so post_comments stays in rank order
     total_comments_fetched = 0
-    for post in ranked_for_comments:
-        post_id = post.get("id")
-        if not post_id:
+    for post, result in zip(posts_to_fetch, results):
+        if isinstance(result, BaseException):
+            logger.error(f"Error fetching comments for post {post['id']}: {result}")
             continue
         
-        comments, comment_error = await fetch_arctic_shift_comments(post_id)
-        
+        comments, comment_error = result
         if comments:
             best_comments = select_best_comments(comments)
             if best_comments:
                 post_comments.append({
-                    "post_id": post_id,
+                    "post_id": post["id"],
                     "post_title": post.get("title", ""),
                     "comments": best_comments
                 })
                 total_comments_fetched += len(best_comments)
-        
-        # Small delay between requests to be nice to the API
-        await asyncio.sleep(COMMENT_FETCH_DELAY)
     
     debug.comments_fetched_for = len(post_comments)
     debug.total_comments = total_comments_fetched
     
-    # Cache the results
+    # Cache the results, locally and for other workers
+    cache_data = {
+        "posts": final_posts,
+        "comments": post_comments
+    }
     reddit_cache[subreddit_lower] = {
-        "data": {
-            "posts": final_posts,
-            "comments": post_comments
-        },
+        "data": cache_data,
         "timestamp": current_time
     }
+    await store_shared_cache(f"reddit:{subreddit_lower}", cache_data, CACHE_TTL_SECONDS + CACHE_STALE_SECONDS)
     
     return final_posts, post_comments, None, False, debug
 
 # ============== AI ANALYSIS ==============
 
+# Shared async client; None when no API key is configured
+openai_api_key = os.environ.get('OPENAI_API_KEY')
+openai_client = AsyncOpenAI(api_key=openai_api_key) if openai_api_key else None
+
+def ai_cache_key(posts: List[dict], game_name: str, keywords: str) -> str:
+    """Stable key for an analysis request: the analyzed post IDs plus everything else in the prompt"""
+    post_ids = ",".join(sorted(post.get("id", "") for post in posts[:MAX_POSTS_FINAL]))
+    key_source = f"{AI_MODEL}|{game_name}|{keywords}|{post_ids}"
+    return hashlib.blake2b(key_source.encode(), digest_size=16).hexdigest()
+
 async def analyze_posts_with_ai(posts: List[dict], post_comments: List[dict], game_name: str, keywords: str = "") -> dict:
-    from openai import OpenAI
-    
-    api_key = os.environ.get('OPENAI_API_KEY')
-    if not api_key:
+    if openai_client is None:
         return {
             "sentiment_label": "Unknown",
             "sentiment_summary": "AI analysis unavailable - no API key configured",
@@ -703,49 +907,52 @@ async def analyze_posts_with_ai(posts: List[dict], post_comments: List[dict], ga
             "wins": []
         }
     
-    # Build post summaries with truncated selftext
-    post_summaries = []
-    post_id_to_link = {}  # Map post IDs to their Reddit links for evidence
-    
+    # Reuse a previous analysis of the same post set
+    cache_key = ai_cache_key(posts, game_name, keywords)
+    cached_result = ai_cache.get(cache_key)
+    if cached_result is None:
+        shared = await load_shared_cache(f"ai:{cache_key}")
+        if shared:
+            cached_result = ai_cache[cache_key] = shared[0]
+    if cached_result is not None:
+        logger.info(f"Using cached AI analysis for {game_name}")
+        return cached_result
+    
+    # Build the post and comment sections as flat line lists, joined once each
+    # (selftext is already truncated to POST_SELFTEXT_TRUNCATE at ingestion)
+    post_lines = []
     for post in posts[:MAX_POSTS_FINAL]:
         post_id = post.get("id", "")
         title = post.get("title", "")
         score = post.get("score", 0)
         num_comments = post.get("num_comments", 0)
-        selftext = (post.get("selftext", "") or "")[:POST_SELFTEXT_TRUNCATE]
-        
-        # Store link for evidence
-        post_id_to_link[post_id] = f"https://www.reddit.com/comments/{post_id}/"
+        selftext = post.get("selftext", "") or ""
         
-        summary = f"[POST:{post_id}] [{score} pts, {num_comments} comments] {title}"
+        post_lines.append(f"[POST:{post_id}] [{score} pts, {num_comments} comments] {title}")
         if selftext and selftext not in ["[removed]", "[deleted]"]:
             selftext_clean = selftext.replace('\n', ' ').strip()
-            summary += f"\n  Content: {selftext_clean}"
-        post_summaries.append(summary)
+            post_lines.append(f"  Content: {selftext_clean}")
     
-    posts_text = "\n".join(post_summaries)
+    posts_text = "\n".join(post_lines)
     
     # Build comment samples text
-    comments_text = ""
+    comment_lines = []
     total_comments = 0
-    if post_comments:
-        comment_sections = []
-        for pc in post_comments:
-            post_id = pc.get("post_id", "")
-            post_title = pc.get("post_title", "")[:100]
-            comments = pc.get("comments", [])
-            
-            if comments:
-                comment_lines = [f"\n--- Comments on [POST:{post_id}] {post_title} ---"]
-                for c in comments:
-                    body = c.get("body", "")
-                    comment_score = c.get("score", 0)
-                    comment_lines.append(f"  [{comment_score} pts] {body}")
-                    total_comments += 1
-                comment_sections.append("\n".join(comment_lines))
+    for pc in post_comments:
+        comments = pc.get("comments", [])
+        if not comments:
+            continue
         
-        if comment_sections:
-            comments_text = "\n\nCOMMENT SAMPLES FROM TOP POSTS:\n" + "\n".join(comment_sections)
+        post_id = pc.get("post_id", "")
+        post_title = pc.get("post_title", "")[:100]
+        comment_lines.append(f"\n--- Comments on [POST:{post_id}] {post_title} ---")
+        for c in comments:
+            comment_lines.append(f"  [{c.get('score', 0)} pts] {c.get('body', '')}")
+        total_comments += len(comments)
+    
+    comments_text = ""
+    if comment_lines:
+        comments_text = "\n\nCOMMENT SAMPLES FROM TOP POSTS:\n" + "\n".join(comment_lines)
     
     keyword_note = f"\nKeywords to watch for: {keywords}" if keywords else ""
     
@@ -788,10 +995,8 @@ Respond ONLY with valid JSON in this exact format:
 }}"""
 
     try:
-        client = OpenAI(api_key=api_key)
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        response = await openai_client.chat.completions.create(
+            model=AI_MODEL,
             messages=[
                 {
                     "role": "system",
@@ -803,35 +1008,26 @@ Respond ONLY with valid JSON in this exact format:
                 }
             ],
             temperature=0.7,
-            max_tokens=2000
+            max_tokens=2000,
+            response_format={"type": "json_object"}
         )
         
-        response_text = response.choices[0].message.content.strip()
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        
-        result = json.loads(response_text.strip())
+        result = orjson.loads(response.choices[0].message.content)
         
         # Validate and normalize pain_points and wins
         for field in ["pain_points", "wins"]:
             if field not in result or not isinstance(result[field], list):
                 result[field] = []
             else:
-                # Normalize: handle both string format (old) and dict format (new)
-                normalized = []
-                for item in result[field]:
-                    if isinstance(item, str):
-                        normalized.append({"text": item, "evidence": []})
-                    elif isinstance(item, dict):
-                        normalized.append({
-                            "text": item.get("text", str(item)),
-                            "evidence": item.get("evidence", [])
-                        })
-                result[field] = normalized[:5]  # Ensure max 5
+                # Normalize: handle both string format (old) and dict format (new),
+                # stopping after the 5 items that are kept
+                normalized = (
+                    {"text": item, "evidence": []} if isinstance(item, str)
+                    else {"text": item.get("text", str(item)), "evidence": item.get("evidence", [])}
+                    for item in result[field]
+                    if isinstance(item, (str, dict))
+                )
+                result[field] = list(islice(normalized, 5))
         
         # Ensure themes is a list
         if "themes" not in result or not isinstance(result["themes"], list):
@@ -843,9 +1039,12 @@ Respond ONLY with valid JSON in this exact format:
         if "sentiment_summary" not in result:
             result["sentiment_summary"] = ""
         
+        ai_cache[cache_key] = result
+        await store_shared_cache(f"ai:{cache_key}", result, AI_CACHE_TTL_SECONDS)
+        
         return result
         
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.error(f"Failed to parse AI response: {e}")
         return {
             "sentiment_label": "Unknown",
@@ -866,36 +1065,48 @@ Respond ONLY with valid JSON in this exact format:
 
 # ============== THROTTLE CHECK ==============
 
-last_scan_times: Dict[str, float] = {}
+# Scan start time by subreddit; entries expire on their own once the throttle window passes
+last_scan_times = TTLCache(maxsize=10_000, ttl=THROTTLE_SECONDS)
 
 def check_throttle(subreddit: str) -> tuple[bool, int]:
-    normalized = normalize_subreddit(subreddit).lower()
-    current_time = time.time()
+    """
+    Check and reserve the subreddit's scan slot in one step (like Redis SET NX EX),
+    so concurrent scans of the same subreddit can't both get through.
+    """
+    normalized = subreddit_key(subreddit)
+    current_time = time.monotonic()
     
-    if normalized in last_scan_times:
-        elapsed = current_time - last_scan_times[normalized]
-        if elapsed < THROTTLE_SECONDS:
-            return True, int(THROTTLE_SECONDS - elapsed)
+    last_scan = last_scan_times.get(normalized)
+    if last_scan is not None:
+        return True, int(THROTTLE_SECONDS - (current_time - last_scan))
     
+    last_scan_times[normalized] = current_time
     return False, 0
 
-def update_scan_time(subreddit: str):
-    normalized = normalize_subreddit(subreddit).lower()
-    last_scan_times[normalized] = time.time()
+# ============== SCAN CONCURRENCY LIMIT ==============
+
+active_scans: Dict[str, int] = {}  # In-flight scans by user_id
+
+async def user_scan_slot(user: User = Depends(get_current_user)):
+    """Hold one of the user's concurrent scan slots for the duration of the request"""
+    if active_scans.get(user.user_id, 0) >= MAX_CONCURRENT_SCANS_PER_USER:
+        raise HTTPException(status_code=429, detail="Too many scans in progress. Wait for one to finish.")
+    active_scans[user.user_id] = active_scans.get(user.user_id, 0) + 1
+    try:
+        yield
+    finally:
+        active_scans[user.user_id] -= 1
+        if not active_scans[user.user_id]:
+            del active_scans[user.user_id]
 
 # ============== AUTH ROUTES ==============
 
 @api_router.post("/auth/signup")
 async def email_signup(request: EmailSignupRequest, response: Response):
     """Sign up with email and password"""
-    # Check if email already exists
-    existing = await db.users.find_one({"email": request.email}, {"_id": 0})
-    if existing:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
     # Create user
     user_id = f"user_{uuid.uuid4().hex[:12]}"
-    password_hash = hash_password(request.password)
+    password_hash = await asyncio.to_thread(hash_password, request.password)
     
     user_doc = {
         "user_id": user_id,
@@ -904,10 +1115,14 @@ async def email_signup(request: EmailSignupRequest, response: Response):
         "picture": "",
         "auth_provider": "email",
         "password_hash": password_hash,
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc)
     }
     
-    await db.users.insert_one(user_doc)
+    # The unique email index rejects duplicates atomically, without a separate lookup
+    try:
+        await db.users.insert_one(user_doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create session
     session_token = await create_session(user_id, response)
@@ -930,9 +1145,18 @@ async def email_login(request: EmailLoginRequest, response: Response):
     if user_doc.get("auth_provider") != "email":
         raise HTTPException(status_code=400, detail="Please use Google to sign in")
     
-    if not verify_password(request.password, user_doc.get("password_hash", "")):
+    password_hash = user_doc.get("password_hash", "")
+    if not await asyncio.to_thread(verify_password, request.password, password_hash):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
+    # Upgrade legacy hashes now that we have the plaintext
+    if password_needs_rehash(password_hash):
+        new_hash = await asyncio.to_thread(hash_password, request.password)
+        await db.users.update_one(
+            {"user_id": user_doc["user_id"]},
+            {"$set": {"password_hash": new_hash}}
+        )
+    
     # Create session
     session_token = await create_session(user_doc["user_id"], response)
     
@@ -960,6 +1184,7 @@ async def logout(request: Request, response: Response):
     session_token = request.cookies.get("session_token")
     
     if session_token:
+        session_cache.pop(session_token, None)
         await db.user_sessions.delete_one({"session_token": session_token})
     
     response.delete_cookie(key="session_token", path="/", samesite="none", secure=True)
@@ -972,17 +1197,18 @@ async def logout(request: Request, response: Response):
 async def root():
     return {"message": "Sentient Tracker API"}
 
-@api_router.get("/games", response_model=List[TrackedGame])
+@api_router.get("/games")
 async def get_games(user: User = Depends(get_current_user)):
     """Get all tracked games for the current user"""
-    games = await db.tracked_games.find(
-        {"user_id": user.user_id},
-        {"_id": 0}
-    ).to_list(100)
-    
-    for game in games:
-        if isinstance(game.get('created_at'), str):
-            game['created_at'] = datetime.fromisoformat(game['created_at'])
+    # Shaped like TrackedGame inside Mongo (model fields only, defaults filled for legacy docs),
+    # so rows go straight to ORJSONResponse without per-row model validation; sorted oldest
+    # first, the order the list has always had
+    games = await db.tracked_games.aggregate([
+        {"$match": {"user_id": user.user_id}},
+        {"$sort": {"created_at": 1}},
+        {"$limit": 100},
+        {"$project": TRACKED_GAME_PROJECTION}
+    ]).to_list(100)
     
     return games
 
@@ -996,9 +1222,7 @@ async def create_game(input: TrackedGameCreate, user: User = Depends(get_current
         subreddit=normalized_sub,
         keywords=input.keywords
     )
-    doc = game.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    await db.tracked_games.insert_one(doc)
+    await db.tracked_games.insert_one(game.model_dump())
     return game
 
 @api_router.get("/games/{game_id}", response_model=TrackedGame)
@@ -1010,20 +1234,11 @@ async def get_game(game_id: str, user: User = Depends(get_current_user)):
     )
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
-    if isinstance(game.get('created_at'), str):
-        game['created_at'] = datetime.fromisoformat(game['created_at'])
     return game
 
 @api_router.put("/games/{game_id}", response_model=TrackedGame)
 async def update_game(game_id: str, input: TrackedGameUpdate, user: User = Depends(get_current_user)):
     """Update a tracked game"""
-    game = await db.tracked_games.find_one(
-        {"id": game_id, "user_id": user.user_id},
-        {"_id": 0}
-    )
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
-    
     # Build update dict
     update_data = {}
     if input.name is not None:
@@ -1033,37 +1248,42 @@ async def update_game(game_id: str, input: TrackedGameUpdate, user: User = Depen
     if input.keywords is not None:
         update_data["keywords"] = input.keywords
     
+    # Update and fetch the updated game in one round-trip
+    game_filter = {"id": game_id, "user_id": user.user_id}
     if update_data:
-        await db.tracked_games.update_one(
-            {"id": game_id, "user_id": user.user_id},
-            {"$set": update_data}
+        updated_game = await db.tracked_games.find_one_and_update(
+            game_filter,
+            {"$set": update_data},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
         )
-    
-    # Fetch updated game
-    updated_game = await db.tracked_games.find_one(
-        {"id": game_id, "user_id": user.user_id},
-        {"_id": 0}
-    )
-    if isinstance(updated_game.get('created_at'), str):
-        updated_game['created_at'] = datetime.fromisoformat(updated_game['created_at'])
+    else:
+        updated_game = await db.tracked_games.find_one(game_filter, {"_id": 0})
+    if not updated_game:
+        raise HTTPException(status_code=404, detail="Game not found")
     
     return updated_game
 
 @api_router.delete("/games/{game_id}")
 async def delete_game(game_id: str, user: User = Depends(get_current_user)):
     """Delete a tracked game and its scan results"""
-    result = await db.tracked_games.delete_one(
-        {"id": game_id, "user_id": user.user_id}
+    # Both deletes are scoped to the user, so the scans can go concurrently with the game
+    result, _ = await asyncio.gather(
+        db.tracked_games.delete_one({"id": game_id, "user_id": user.user_id}),
+        db.scan_results.delete_many({"tracked_game_id": game_id, "user_id": user.user_id})
     )
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Game not found")
-    await db.scan_results.delete_many({"tracked_game_id": game_id, "user_id": user.user_id})
     return {"message": "Game deleted successfully"}
 
 # ============== SCAN ROUTES (PROTECTED) ==============
 
-@api_router.post("/games/{game_id}/scan", response_model=ScanResult)
-async def run_scan(game_id: str, user: User = Depends(get_current_user)):
+async def save_scan_result(scan_result: ScanResult):
+    """Persist a scan result (run after the response is sent, so the client doesn't wait on the write)"""
+    await db.scan_results.insert_one(scan_result.model_dump())
+
+@api_router.post("/games/{game_id}/scan", response_model=ScanResult, dependencies=[Depends(user_scan_slot)])
+async def run_scan(game_id: str, background_tasks: BackgroundTasks, user: User = Depends(get_current_user)):
     """Run a Reddit scan for a tracked game"""
     game = await db.tracked_games.find_one(
         {"id": game_id, "user_id": user.user_id},
@@ -1089,7 +1309,6 @@ async def run_scan(game_id: str, user: User = Depends(get_current_user)):
         )
     
     posts, post_comments, error, used_cache, debug = await fetch_reddit_posts(subreddit)
-    update_scan_time(subreddit)
     
     if error:
         scan_result = ScanResult(
@@ -1098,9 +1317,7 @@ async def run_scan(game_id: str, user: User = Depends(get_current_user)):
             error=error,
             debug_info=debug
         )
-        doc = scan_result.model_dump()
-        doc['created_at'] = doc['created_at'].isoformat()
-        await db.scan_results.insert_one(doc)
+        background_tasks.add_task(save_scan_result, scan_result)
         return scan_result
     
     if len(posts) == 0:
@@ -1111,9 +1328,7 @@ async def run_scan(game_id: str, user: User = Depends(get_current_user)):
             error=f"No posts found for r/{subreddit}. The subreddit may be empty, private, or the name may be incorrect.",
             debug_info=debug
         )
-        doc = scan_result.model_dump()
-        doc['created_at'] = doc['created_at'].isoformat()
-        await db.scan_results.insert_one(doc)
+        background_tasks.add_task(save_scan_result, scan_result)
         return scan_result
     
     now = datetime.now(timezone.utc).timestamp()
@@ -1154,47 +1369,41 @@ async def run_scan(game_id: str, user: User = Depends(get_current_user)):
         debug_info=debug
     )
     
-    doc = scan_result.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    await db.scan_results.insert_one(doc)
+    background_tasks.add_task(save_scan_result, scan_result)
     
     return scan_result
 
+# source_posts dominates a scan result's size and is only needed when showing the posts themselves
+SCAN_RESULT_LIGHT_PROJECTION = {"_id": 0, "source_posts": 0}
+
 @api_router.get("/games/{game_id}/results", response_model=List[ScanResult])
-async def get_scan_results(game_id: str, limit: int = 10, user: User = Depends(get_current_user)):
-    """Get scan results for a tracked game"""
+async def get_scan_results(game_id: str, limit: int = 10, light: bool = False, user: User = Depends(get_current_user)):
+    """Get scan results for a tracked game (light=true leaves out the embedded source posts)"""
     results = await db.scan_results.find(
         {"tracked_game_id": game_id, "user_id": user.user_id},
-        {"_id": 0}
+        SCAN_RESULT_LIGHT_PROJECTION if light else {"_id": 0}
     ).sort("created_at", -1).to_list(limit)
     
-    for result in results:
-        if isinstance(result.get('created_at'), str):
-            result['created_at'] = datetime.fromisoformat(result['created_at'])
-    
     return results
 
 @api_router.get("/games/{game_id}/latest-result", response_model=Optional[ScanResult])
-async def get_latest_scan_result(game_id: str, user: User = Depends(get_current_user)):
-    """Get the most recent scan result"""
+async def get_latest_scan_result(game_id: str, light: bool = False, user: User = Depends(get_current_user)):
+    """Get the most recent scan result (light=true leaves out the embedded source posts)"""
     result = await db.scan_results.find_one(
         {"tracked_game_id": game_id, "user_id": user.user_id},
-        {"_id": 0},
+        SCAN_RESULT_LIGHT_PROJECTION if light else {"_id": 0},
         sort=[("created_at", -1)]
     )
     
-    if result and isinstance(result.get('created_at'), str):
-        result['created_at'] = datetime.fromisoformat(result['created_at'])
-    
     return result
 
 @api_router.get("/cache-status/{subreddit}")
 async def get_cache_status(subreddit: str):
-    normalized = normalize_subreddit(subreddit).lower()
-    current_time = time.time()
+    normalized = subreddit_key(subreddit)
     
-    if normalized in reddit_cache:
-        cache_entry = reddit_cache[normalized]
+    cache_entry = await get_posts_cache_entry(normalized)
+    if cache_entry:
+        current_time = time.monotonic()
         cache_age = current_time - cache_entry["timestamp"]
         is_valid = cache_age < CACHE_TTL_SECONDS
         return {
@@ -1202,7 +1411,7 @@ async def get_cache_status(subreddit: str):
             "valid": is_valid,
             "age_seconds": int(cache_age),
             "expires_in": max(0, int(CACHE_TTL_SECONDS - cache_age)),
-            "post_count": len(cache_entry["data"])
+            "post_count": len(cache_entry["data"]["posts"])
         }
     
     return {"cached": False, "valid": False}
@@ -1226,13 +1435,16 @@ async def update_profile(request: UpdateProfileRequest, user: User = Depends(get
     if not update_data:
         raise HTTPException(status_code=400, detail="No fields to update")
     
-    await db.users.update_one(
+    # Update and return the updated user in one round-trip
+    user_doc = await db.users.find_one_and_update(
         {"user_id": user.user_id},
-        {"$set": update_data}
+        {"$set": update_data},
+        projection={"_id": 0, "password_hash": 0},
+        return_document=ReturnDocument.AFTER
     )
+    # Cached sessions hold the old profile
+    evict_cached_sessions(user.user_id)
     
-    # Return updated user
-    user_doc = await db.users.find_one({"user_id": user.user_id}, {"_id": 0, "password_hash": 0})
     return user_doc
 
 @api_router.post("/account/change-password")
@@ -1248,7 +1460,7 @@ async def change_password(request: ChangePasswordRequest, user: User = Depends(g
         raise HTTPException(status_code=400, detail="Password change only available for email accounts")
     
     # Verify current password
-    if not verify_password(request.current_password, user_doc.get("password_hash", "")):
+    if not await asyncio.to_thread(verify_password, request.current_password, user_doc.get("password_hash", "")):
         raise HTTPException(status_code=401, detail="Current password is incorrect")
     
     # Validate new password
@@ -1256,11 +1468,12 @@ async def change_password(request: ChangePasswordRequest, user: User = Depends(g
         raise HTTPException(status_code=400, detail="New password must be at least 6 characters")
     
     # Update password
-    new_hash = hash_password(request.new_password)
+    new_hash = await asyncio.to_thread(hash_password, request.new_password)
     await db.users.update_one(
         {"user_id": user.user_id},
         {"$set": {"password_hash": new_hash}}
     )
+    evict_cached_sessions(user.user_id)
     
     return {"message": "Password changed successfully"}
 
@@ -1275,23 +1488,16 @@ async def get_sessions(user: User = Depends(get_current_user)):
     # Add a simple ID for each session
     for i, session in enumerate(sessions):
         session["session_id"] = i + 1
-        if isinstance(session.get("created_at"), str):
-            session["created_at"] = datetime.fromisoformat(session["created_at"])
-        if isinstance(session.get("expires_at"), str):
-            session["expires_at"] = datetime.fromisoformat(session["expires_at"])
     
     return sessions
 
 @api_router.delete("/account/sessions")
 async def revoke_other_sessions(request: Request, user: User = Depends(get_current_user)):
     """Revoke all sessions except the current one"""
-    current_token = request.cookies.get("session_token")
-    if not current_token:
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            current_token = auth_header[7:]
+    current_token = request.state.session_token  # Set by get_current_user
     
     # Delete all sessions except current
+    evict_cached_sessions(user.user_id, keep_token=current_token)
     result = await db.user_sessions.delete_many({
         "user_id": user.user_id,
         "session_token": {"$ne": current_token}
@@ -1304,19 +1510,25 @@ async def delete_account(user: User = Depends(get_current_user)):
     """Delete user account and all associated data"""
     user_id = user.user_id
     
-    # Delete all user data
-    await db.scan_results.delete_many({"user_id": user_id})
-    await db.tracked_games.delete_many({"user_id": user_id})
-    await db.user_sessions.delete_many({"user_id": user_id})
-    await db.users.delete_one({"user_id": user_id})
+    # Delete all user data (independent collections, so concurrently)
+    evict_cached_sessions(user_id)
+    await asyncio.gather(
+        db.scan_results.delete_many({"user_id": user_id}),
+        db.tracked_games.delete_many({"user_id": user_id}),
+        db.user_sessions.delete_many({"user_id": user_id}),
+        db.users.delete_one({"user_id": user_id})
+    )
     
     return {"message": "Account deleted successfully"}
 
 @api_router.get("/account/stats")
 async def get_account_stats(user: User = Depends(get_current_user)):
     """Get account statistics"""
-    games_count = await db.tracked_games.count_documents({"user_id": user.user_id})
-    scans_count = await db.scan_results.count_documents({"user_id": user.user_id})
+    # Independent collections, so count both concurrently
+    games_count, scans_count = await asyncio.gather(
+        db.tracked_games.count_documents({"user_id": user.user_id}),
+        db.scan_results.count_documents({"user_id": user.user_id})
+    )
     
     return {
         "games_count": games_count,
@@ -1325,42 +1537,55 @@ async def get_account_stats(user: User = Depends(get_current_user)):
 
 # ============== SCAN HISTORY WITH TREND DATA ==============
 
+def count_of(field: str) -> dict:
+    """Aggregation expression for the length of an array field that may be missing"""
+    return {"$size": {"$ifNull": [f"${field}", []]}}
+
+# Trend point per scan, computed in Mongo so only the chart fields come back
+TREND_POINT_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "created_at": 1,
+    "sentiment_label": {"$ifNull": ["$sentiment_label", "Unknown"]},
+    "sentiment_value": {"$switch": {
+        "branches": [
+            {"case": {"$eq": ["$sentiment_label", label]}, "then": value}
+            for label, value in SENTIMENT_MAP.items() if value
+        ],
+        "default": 0
+    }},
+    "post_count": {"$ifNull": ["$post_count", 0]},
+    "comments_sampled": {"$ifNull": ["$comments_sampled", 0]},
+    "themes_count": count_of("themes"),
+    "pain_points_count": count_of("pain_points"),
+    "wins_count": count_of("wins")
+}
+
 @api_router.get("/games/{game_id}/history")
 async def get_scan_history(game_id: str, limit: int = 20, user: User = Depends(get_current_user)):
     """Get scan history with trend data for charts"""
-    # Verify game belongs to user
-    game = await db.tracked_games.find_one(
-        {"id": game_id, "user_id": user.user_id},
-        {"_id": 0}
-    )
-    if not game:
+    # Fetch the game (verifying it belongs to the user) and trend points for its
+    # recent successful scans in one round-trip
+    games = await db.tracked_games.aggregate([
+        {"$match": {"id": game_id, "user_id": user.user_id}},
+        {"$limit": 1},
+        {"$lookup": {
+            "from": "scan_results",
+            "pipeline": [
+                {"$match": {"tracked_game_id": game_id, "user_id": user.user_id, "error": None}},
+                {"$sort": {"created_at": -1}},
+                {"$limit": limit},
+                {"$project": TREND_POINT_PROJECTION}
+            ],
+            "as": "scans"
+        }},
+        {"$project": {"_id": 0}}
+    ]).to_list(1)
+    if not games:
         raise HTTPException(status_code=404, detail="Game not found")
-    
-    # Get historical scans (exclude source_posts for lighter response)
-    results = await db.scan_results.find(
-        {"tracked_game_id": game_id, "user_id": user.user_id, "error": None},
-        {"_id": 0, "source_posts": 0}
-    ).sort("created_at", -1).to_list(limit)
-    
-    # Convert sentiment to numeric for charting
-    sentiment_map = {"Positive": 1, "Mixed": 0, "Negative": -1, "Unknown": 0}
-    
-    trend_data = []
-    for result in reversed(results):  # Oldest first for chart
-        if isinstance(result.get('created_at'), str):
-            result['created_at'] = datetime.fromisoformat(result['created_at'])
-        
-        trend_data.append({
-            "id": result.get("id"),
-            "created_at": result.get("created_at").isoformat() if result.get("created_at") else None,
-            "sentiment_label": result.get("sentiment_label", "Unknown"),
-            "sentiment_value": sentiment_map.get(result.get("sentiment_label", "Unknown"), 0),
-            "post_count": result.get("post_count", 0),
-            "comments_sampled": result.get("comments_sampled", 0),
-            "themes_count": len(result.get("themes", [])),
-            "pain_points_count": len(result.get("pain_points", [])),
-            "wins_count": len(result.get("wins", []))
-        })
+    game = games[0]
+    # Oldest first for chart
+    trend_data = game.pop("scans")[::-1]
     
     return {
         "game": game,
@@ -1379,6 +1604,100 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+DATE_MIGRATION_ID = "native_dates"  # schema_migrations marker for the string-to-datetime conversion
+DATE_MIGRATION_BATCH_SIZE = 1000  # Updates per bulk_write, so the migration never holds a whole collection's worth
+
+async def migrate_string_dates(collection, date_fields: tuple[str, ...]):
+    """Convert documents stored with ISO string dates, from before dates were native datetimes"""
+    converted_count = 0
+    batch = []
+    async for doc in collection.find(
+        {"$or": [{field: {"$type": "string"}} for field in date_fields]},
+        {field: 1 for field in date_fields}
+    ):
+        converted = {}
+        for field in date_fields:
+            value = doc.get(field)
+            if not isinstance(value, str):
+                continue
+            try:
+                converted[field] = datetime.fromisoformat(value)
+            except ValueError:
+                # Leave malformed legacy values as they are rather than blocking startup
+                logger.warning(f"Skipping unparseable {collection.name}.{field} on {doc['_id']}: {value!r}")
+        if converted:
+            batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": converted}))
+        if len(batch) >= DATE_MIGRATION_BATCH_SIZE:
+            await collection.bulk_write(batch, ordered=False)
+            converted_count += len(batch)
+            batch = []
+    if batch:
+        await collection.bulk_write(batch, ordered=False)
+        converted_count += len(batch)
+    if converted_count:
+        logger.info(f"Converted string dates on {converted_count} {collection.name} documents")
+
+@app.on_event("startup")
+async def create_indexes():
+    """Index the query shapes the routes use and let Mongo purge expired sessions"""
+    await db.user_sessions.create_index("session_token", unique=True)
+    await db.user_sessions.create_index("user_id")
+    await db.user_sessions.create_index("expires_at", expireAfterSeconds=0)
+    await db.users.create_index("user_id", unique=True)
+    await db.users.create_index("email", unique=True)
+    await db.cache_entries.create_index("expires_at", expireAfterSeconds=0)
+    await db.tracked_games.create_index([("user_id", 1), ("id", 1)], unique=True)
+    # Results/latest (and per-game deletes) sort by created_at; history also filters on error
+    await db.scan_results.create_index([("tracked_game_id", 1), ("user_id", 1), ("created_at", -1)])
+    await db.scan_results.create_index([("tracked_game_id", 1), ("user_id", 1), ("error", 1), ("created_at", -1)])
+    await db.scan_results.create_index("user_id")
+
+@app.on_event("startup")
+async def migrate_dates():
+    """Run the string-date conversion once; the marker keeps later boots from rescanning every collection"""
+    if await db.schema_migrations.find_one({"_id": DATE_MIGRATION_ID}):
+        return
+    for collection, date_fields in (
+        (db.user_sessions, ("expires_at", "created_at")),
+        (db.users, ("created_at",)),
+        (db.tracked_games, ("created_at",)),
+        (db.scan_results, ("created_at",))
+    ):
+        await migrate_string_dates(collection, date_fields)
+    await db.schema_migrations.update_one(
+        {"_id": DATE_MIGRATION_ID},
+        {"$setOnInsert": {"applied_at": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+
+async def purge_expired_caches():
+    """TTLCache only expires entries lazily on access, so sweep idle ones periodically"""
+    while True:
+        await asyncio.sleep(CACHE_PURGE_INTERVAL_SECONDS)
+        for cache in (reddit_cache, comments_cache, ai_cache, session_cache, session_tokens_by_user, last_scan_times):
+            cache.expire()
+
+cache_purge_task: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def start_cache_purge():
+    global cache_purge_task
+    cache_purge_task = asyncio.create_task(purge_expired_caches())
+
+@app.on_event("shutdown")
+async def stop_cache_purge():
+    if cache_purge_task is not None:
+        cache_purge_task.cancel()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
+
+@app.on_event("shutdown")
+async def shutdown_http_client():
+    await http_client.aclose()
+
+@app.on_event("shutdown")
+async def shutdown_openai_client():
+    if openai_client is not None:
+        await openai_client.close()
@@ -0,0 +1,60 @@
+"""
+Shared fixtures for the Sentient Tracker backend API tests
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+from settings import BASE_URL, TEST_GAME_ID, SESSION_TOKEN
+
+# Concurrent requests per fan-out; the session's connection pool must be at least this large
+FETCH_WORKERS = 4
+
+
+def fetch_all(session, urls):
+    """GET independent URLs concurrently over the shared session, keyed like `urls`"""
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        futures = {name: executor.submit(session.get, url) for name, url in urls.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+@pytest.fixture(scope="session")
+def auth_session():
+    """One authenticated session (and keep-alive connection) for the whole test run"""
+    session = requests.Session()
+    session.headers.update({
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {SESSION_TOKEN}"
+    })
+    adapter = HTTPAdapter(pool_maxsize=FETCH_WORKERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def game_snapshot(auth_session):
+    """The test game and its latest scan result, fetched concurrently once per run"""
+    responses = fetch_all(auth_session, {
+        "game": f"{BASE_URL}/api/games/{TEST_GAME_ID}",
+        "latest_result": f"{BASE_URL}/api/games/{TEST_GAME_ID}/latest-result",
+    })
+    for name, response in responses.items():
+        assert response.status_code == 200, f"{name} returned {response.status_code}"
+    return {name: response.json() for name, response in responses.items()}
+
+
+@pytest.fixture(scope="session")
+def game(game_snapshot):
+    """The test game's details"""
+    return game_snapshot["game"]
+
+
+@pytest.fixture(scope="session")
+def latest_result(game_snapshot):
+    """The test game's latest scan result, shared by every test that reads it"""
+    return game_snapshot["latest_result"]
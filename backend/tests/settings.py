@@ -0,0 +1,13 @@
+"""
+Shared settings for the Sentient Tracker backend API tests
+"""
+
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+# Test credentials from the review request
+TEST_USER_EMAIL = "test2@example.com"
+TEST_USER_PASSWORD = "password123"
+TEST_GAME_ID = "44496f4f-a82b-489b-9d4e-2bc1626e8076"
+SESSION_TOKEN = "S0g3aaQHomRqbMhNW65PLQ9Q9VV_SPwsC9BBRtEEBSs"
@@ -5,29 +5,25 @@ Tests: POST selection with quality filtering, comment sampling, AI summarization
 
 import pytest
 import requests
-import os
-import time
 
-BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+from settings import BASE_URL, TEST_GAME_ID
 
-# Test credentials from the review request
-TEST_USER_EMAIL = "test2@example.com"
-TEST_USER_PASSWORD = "password123"
-TEST_GAME_ID = "44496f4f-a82b-489b-9d4e-2bc1626e8076"
-SESSION_TOKEN = "S0g3aaQHomRqbMhNW65PLQ9Q9VV_SPwsC9BBRtEEBSs"
+REDDIT_PREFIX = "https://www.reddit.com/"
+
+
+def assert_reddit_links(links):
+    """Assert every evidence link is a Reddit URL, in one pass over the links"""
+    bad_links = [link for link in links if not link.startswith(REDDIT_PREFIX)]
+    assert not bad_links, f"Invalid evidence link: {bad_links[0]}"
 
 
 class TestArcticsShiftScan:
     """Tests for the Arctic Shift Reddit scan functionality"""
     
     @pytest.fixture(autouse=True)
-    def setup(self):
-        """Setup test session with authentication"""
-        self.session = requests.Session()
-        self.session.headers.update({
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {SESSION_TOKEN}"
-        })
+    def setup(self, auth_session):
+        """Use the shared authenticated session"""
+        self.session = auth_session
     
     def test_api_root_health(self):
         """Test API root endpoint is reachable"""
@@ -45,21 +41,17 @@ class TestArcticsShiftScan:
         assert "email" in data
         print(f"Authenticated as: {data['email']}")
     
-    def test_get_game_details(self):
+    def test_get_game_details(self, game):
         """Test fetching game details before scanning"""
-        response = self.session.get(f"{BASE_URL}/api/games/{TEST_GAME_ID}")
-        assert response.status_code == 200
-        data = response.json()
+        data = game
         assert "id" in data
         assert "name" in data
         assert "subreddit" in data
         print(f"Game: {data['name']} - r/{data['subreddit']}")
     
-    def test_get_latest_scan_result(self):
+    def test_get_latest_scan_result(self, latest_result):
         """Test fetching the most recent scan result"""
-        response = self.session.get(f"{BASE_URL}/api/games/{TEST_GAME_ID}/latest-result")
-        assert response.status_code == 200
-        data = response.json()
+        data = latest_result
         
         if data:
             # Validate scan result structure
@@ -107,6 +99,7 @@ class TestArcticsShiftScan:
         else:
             print("No previous scan results found - this is expected for new games")
     
+    @pytest.mark.serial
     def test_scan_throttling(self):
         """Test that throttling prevents scans within 30 seconds of each other"""
         # First scan attempt
@@ -128,11 +121,9 @@ class TestArcticsShiftScan:
             assert data2.get("cached") == True, "Should either be throttled or cached"
             print("Using cached result instead of throttled")
     
-    def test_scan_result_structure_comprehensive(self):
+    def test_scan_result_structure_comprehensive(self, latest_result):
         """Comprehensive test of scan result structure with all new fields"""
-        response = self.session.get(f"{BASE_URL}/api/games/{TEST_GAME_ID}/latest-result")
-        assert response.status_code == 200
-        data = response.json()
+        data = latest_result
         
         if not data:
             pytest.skip("No scan results available for comprehensive testing")
@@ -190,11 +181,9 @@ class TestArcticsShiftScan:
         
         print(f"Comprehensive structure validation passed")
     
-    def test_source_posts_have_required_fields(self):
+    def test_source_posts_have_required_fields(self, latest_result):
         """Test that source posts contain all required fields"""
-        response = self.session.get(f"{BASE_URL}/api/games/{TEST_GAME_ID}/latest-result")
-        assert response.status_code == 200
-        data = response.json()
+        data = latest_result
         
         if not data or not data.get("source_posts"):
             pytest.skip("No source posts available")
@@ -210,11 +199,9 @@ class TestArcticsShiftScan:
         
         print(f"Validated {min(5, len(data['source_posts']))} source posts")
     
-    def test_cache_status_endpoint(self):
+    def test_cache_status_endpoint(self, game):
         """Test the cache status endpoint"""
-        # Get game details to know the subreddit
-        game_response = self.session.get(f"{BASE_URL}/api/games/{TEST_GAME_ID}")
-        game = game_response.json()
+        # Game details (fetched alongside the latest result) give the subreddit
         subreddit = game.get("subreddit", "Eldenring")
         
         response = requests.get(f"{BASE_URL}/api/cache-status/{subreddit}")
@@ -237,18 +224,12 @@ class TestQualityFilter:
     """Tests for quality filtering logic"""
     
     @pytest.fixture(autouse=True)
-    def setup(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {SESSION_TOKEN}"
-        })
+    def setup(self, auth_session):
+        self.session = auth_session
     
-    def test_quality_filter_reduces_post_count(self):
+    def test_quality_filter_reduces_post_count(self, latest_result):
         """Verify quality filter removes low-quality posts"""
-        response = self.session.get(f"{BASE_URL}/api/games/{TEST_GAME_ID}/latest-result")
-        assert response.status_code == 200
-        data = response.json()
+        data = latest_result
         
         if not data or not data.get("debug_info"):
             pytest.skip("No debug info available")
@@ -266,18 +247,12 @@ class TestCommentSampling:
     """Tests for comment sampling functionality"""
     
     @pytest.fixture(autouse=True)
-    def setup(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {SESSION_TOKEN}"
-        })
+    def setup(self, auth_session):
+        self.session = auth_session
     
-    def test_comments_fetched_for_top_posts(self):
+    def test_comments_fetched_for_top_posts(self, latest_result):
         """Verify comments are fetched for top 15 posts"""
-        response = self.session.get(f"{BASE_URL}/api/games/{TEST_GAME_ID}/latest-result")
-        assert response.status_code == 200
-        data = response.json()
+        data = latest_result
         
         if not data or not data.get("debug_info"):
             pytest.skip("No debug info available")
@@ -300,50 +275,36 @@ class TestAISummarization:
     """Tests for AI summarization with evidence links"""
     
     @pytest.fixture(autouse=True)
-    def setup(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {SESSION_TOKEN}"
-        })
+    def setup(self, auth_session):
+        self.session = auth_session
     
-    def test_pain_points_have_evidence_links(self):
+    def test_pain_points_have_evidence_links(self, latest_result):
         """Verify pain points include evidence links"""
-        response = self.session.get(f"{BASE_URL}/api/games/{TEST_GAME_ID}/latest-result")
-        assert response.status_code == 200
-        data = response.json()
+        data = latest_result
         
         if not data or not data.get("pain_points"):
             pytest.skip("No pain points available")
         
-        has_evidence = False
-        for pp in data["pain_points"]:
-            assert "text" in pp, "Pain point must have 'text' field"
-            assert "evidence" in pp, "Pain point must have 'evidence' field"
-            if pp["evidence"]:
-                has_evidence = True
-                for link in pp["evidence"]:
-                    assert link.startswith("https://www.reddit.com/"), f"Invalid evidence link: {link}"
+        assert all("text" in pp for pp in data["pain_points"]), "Pain point must have 'text' field"
+        assert all("evidence" in pp for pp in data["pain_points"]), "Pain point must have 'evidence' field"
+        links = [link for pp in data["pain_points"] for link in pp["evidence"]]
+        assert_reddit_links(links)
+        has_evidence = bool(links)
         
         print(f"Pain points have evidence links: {has_evidence}")
     
-    def test_wins_have_evidence_links(self):
+    def test_wins_have_evidence_links(self, latest_result):
         """Verify wins include evidence links"""
-        response = self.session.get(f"{BASE_URL}/api/games/{TEST_GAME_ID}/latest-result")
-        assert response.status_code == 200
-        data = response.json()
+        data = latest_result
         
         if not data or not data.get("wins"):
             pytest.skip("No wins available")
         
-        has_evidence = False
-        for win in data["wins"]:
-            assert "text" in win, "Win must have 'text' field"
-            assert "evidence" in win, "Win must have 'evidence' field"
-            if win["evidence"]:
-                has_evidence = True
-                for link in win["evidence"]:
-                    assert link.startswith("https://www.reddit.com/"), f"Invalid evidence link: {link}"
+        assert all("text" in win for win in data["wins"]), "Win must have 'text' field"
+        assert all("evidence" in win for win in data["wins"]), "Win must have 'evidence' field"
+        links = [link for win in data["wins"] for link in win["evidence"]]
+        assert_reddit_links(links)
+        has_evidence = bool(links)
         
         print(f"Wins have evidence links: {has_evidence}")
 
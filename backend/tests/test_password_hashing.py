@@ -0,0 +1,68 @@
+"""
+Unit tests for password hashing - argon2id hashes and legacy salted SHA-256 hashes
+"""
+
+import hashlib
+import os
+
+import pytest
+
+# server reads these at import; the Mongo client connects lazily, so no database is needed
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+
+from server import hash_password, verify_password, password_needs_rehash  # noqa: E402
+
+PASSWORD = "password123"
+
+
+def legacy_hash(password, salt="0123456789abcdef0123456789abcdef"):
+    """A hash in the pre-argon2 format: '<salt>:<sha256(password + salt)>'"""
+    return f"{salt}:{hashlib.sha256((password + salt).encode()).hexdigest()}"
+
+
+class TestVerifyPassword:
+    """Tests for verify_password across stored hash formats"""
+
+    def test_argon2_hash_round_trip(self):
+        stored_hash = hash_password(PASSWORD)
+        assert stored_hash.startswith("$argon2id$")
+        assert verify_password(PASSWORD, stored_hash)
+
+    def test_argon2_hash_wrong_password(self):
+        assert not verify_password("wrong-password", hash_password(PASSWORD))
+
+    def test_legacy_sha256_hash(self):
+        assert verify_password(PASSWORD, legacy_hash(PASSWORD))
+
+    def test_legacy_sha256_hash_wrong_password(self):
+        assert not verify_password("wrong-password", legacy_hash(PASSWORD))
+
+    @pytest.mark.parametrize("stored_hash", [
+        "",
+        "garbage",
+        "a:b:c",
+        "$argon2id$garbage",
+        "$argon2id$v=19$m=19456,t=2,p=1$bm90YXNhbHQ$bm90YWhhc2g",
+        None,
+    ])
+    def test_empty_or_garbage_hash_is_rejected(self, stored_hash):
+        assert not verify_password(PASSWORD, stored_hash)
+
+
+class TestPasswordNeedsRehash:
+    """Tests for password_needs_rehash"""
+
+    def test_current_argon2_hash_is_kept(self):
+        assert not password_needs_rehash(hash_password(PASSWORD))
+
+    def test_legacy_sha256_hash_needs_rehash(self):
+        assert password_needs_rehash(legacy_hash(PASSWORD))
+
+    def test_argon2_hash_with_other_parameters_needs_rehash(self):
+        weaker_hash = "$argon2id$v=19$m=8192,t=1,p=1$c29tZXNhbHRzb21lc2FsdA$" + "A" * 43
+        assert password_needs_rehash(weaker_hash)
+
+    @pytest.mark.parametrize("stored_hash", ["", "garbage"])
+    def test_empty_or_garbage_hash_needs_rehash(self, stored_hash):
+        assert password_needs_rehash(stored_hash)
@@ -1,8 +1,13 @@
-import requests
+import httpx
+from http.cookiejar import DefaultCookiePolicy
 import sys
 import json
 from datetime import datetime
 import time
+import re
+
+# Matches the server's scan throttle message: "Please wait 12 seconds before scanning ..."
+THROTTLE_WAIT_RE = re.compile(r"wait (\d+) seconds")
 
 class SentientTrackerAPITester:
     def __init__(self, base_url="https://reddit-analyzer-1.preview.emergentagent.com"):
@@ -17,11 +22,24 @@ class SentientTrackerAPITester:
         self.test_email = "testuser2@example.com"
         self.test_password = "testpass123"
         self.test_name = "Test User 2"
+        # One HTTP/2 client so every test multiplexes over the same keep-alive TLS connection
+        self.client = httpx.Client(
+            base_url=self.api_url,
+            headers={'Content-Type': 'application/json'},
+            timeout=httpx.Timeout(30.0),
+            transport=httpx.HTTPTransport(
+                http2=True,
+                retries=2,
+                limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+            ),
+        )
+        # Don't keep the session cookie: auth is sent explicitly so unauthenticated tests stay unauthenticated
+        self.client.cookies.jar.set_policy(DefaultCookiePolicy(allowed_domains=[]))
 
     def run_test(self, name, method, endpoint, expected_status, data=None, timeout=30, authenticated=False):
         """Run a single API test"""
         url = f"{self.api_url}/{endpoint}"
-        headers = {'Content-Type': 'application/json'}
+        headers = {}
         
         # Add authentication if required and available
         if authenticated and self.session_token:
@@ -34,14 +52,12 @@ class SentientTrackerAPITester:
             print(f"   Auth: {'✓' if self.session_token else '✗'}")
         
         try:
-            if method == 'GET':
-                response = requests.get(url, headers=headers, timeout=timeout)
-            elif method == 'POST':
-                response = requests.post(url, json=data, headers=headers, timeout=timeout)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=headers, timeout=timeout)
-            elif method == 'PUT':
-                response = requests.put(url, json=data, headers=headers, timeout=timeout)
+            response = self.client.request(
+                method, endpoint,
+                json=data if method in ('POST', 'PUT') else None,
+                headers=headers,
+                timeout=timeout
+            )
 
             success = response.status_code == expected_status
             if success:
@@ -66,10 +82,10 @@ class SentientTrackerAPITester:
                     print(f"   Raw Response: {response.text[:200]}")
                 return False, {}
 
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             print(f"❌ FAILED - Request timed out after {timeout} seconds")
             return False, {}
-        except requests.exceptions.ConnectionError:
+        except httpx.ConnectError:
             print(f"❌ FAILED - Connection error to {url}")
             return False, {}
         except Exception as e:
@@ -215,6 +231,14 @@ class SentientTrackerAPITester:
         
         print("   🚨 This may take 30-60 seconds for Reddit fetch + AI analysis...")
         success, data = self.run_test("Run Scan (Authenticated)", "POST", f"games/{self.test_game_id}/scan", 200, timeout=120, authenticated=True)
+
+        # Pace off the server's throttle instead of a fixed guess: wait exactly as long as it asks, then retry once
+        throttle = THROTTLE_WAIT_RE.search(data.get('error') or '') if success else None
+        if throttle:
+            wait_seconds = int(throttle.group(1))
+            print(f"   ⏳ Throttled - waiting {wait_seconds}s before retrying")
+            time.sleep(wait_seconds)
+            success, data = self.run_test("Run Scan (Authenticated)", "POST", f"games/{self.test_game_id}/scan", 200, timeout=120, authenticated=True)
         
         if success:
             print(f"   Scan ID: {data.get('id', 'Unknown')}")
@@ -302,9 +326,8 @@ def main():
         except Exception as e:
             print(f"❌ Test '{test_name}' crashed: {e}")
             failed_tests.append(test_name)
-        
-        # Small delay between tests
-        time.sleep(0.5)
+
+    tester.client.close()
     
     print("\n" + "=" * 60)
     print("🏁 AUTHENTICATION TEST RESULTS SUMMARY")
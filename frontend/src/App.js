@@ -1295,7 +1295,7 @@ const ScanHistoryList = ({ gameId }) => {
   useEffect(() => {
     const fetchResults = async () => {
       try {
-        const response = await axios.get(`${API}/games/${gameId}/results?limit=20`);
+        const response = await axios.get(`${API}/games/${gameId}/results?limit=20&light=true`);
         setResults(response.data);
       } catch (e) {
         console.error("Error fetching results:", e);
@@ -2,51 +2,319 @@
 """
 Quick test to verify if we can get successful Reddit data from any subreddit
 """
-import requests
-import json
+import asyncio
+import os
+import random
+import shelve
+import sys
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+import httpx
+import orjson
+
+try:
+    import uvloop
+except ImportError:  # optional: fall back to the default asyncio loop
+    uvloop = None
+
+SUBREDDITS = ('Python', 'programming', 'technology', 'news', 'pics', 'funny')
+MULTIREDDIT = '+'.join(SUBREDDITS)
+LISTING_URL = "https://www.reddit.com/r/{}/new.json?limit={}"
+HEADERS = {"User-Agent": "SentientTracker/1.0 (Game Community Pulse MVP)"}
+TIMEOUT = httpx.Timeout(10.0)
+
+# With app credentials, probe through OAuth for Reddit's authenticated rate limit instead of the anonymous one
+REDDIT_CLIENT_ID = os.environ.get("REDDIT_CLIENT_ID")
+REDDIT_CLIENT_SECRET = os.environ.get("REDDIT_CLIENT_SECRET")
+TOKEN_URL = "https://www.reddit.com/api/v1/access_token"
+OAUTH_LISTING_URL = "https://oauth.reddit.com/r/{}/new?limit={}"
+TOKEN_EXPIRY_MARGIN = 60  # seconds
+
+_access_token = {"value": None, "expires_at": 0.0}
+
+# On-disk response cache: fresh entries skip the network, stale ones revalidate with ETag/Last-Modified
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".quick_scan_cache")
+CACHE_TTL = 60  # seconds
+
+POSTS_PER_SUBREDDIT = 5
+
+# Transient failures are retried with jittered exponential backoff
+MAX_ATTEMPTS = 3
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 2  # seconds
+# Fallback wait when a 429 comes back without a usable Retry-After
+DEFAULT_RETRY_AFTER = 10  # seconds
+
+# Transport failures, and 200 bodies that aren't a listing (e.g. an HTML block page), fail just that probe
+PROBE_ERRORS = (httpx.HTTPError, ValueError)
+
+class RateLimitPacer:
+    """Holds requests back only when Reddit's X-Ratelimit-* budget is about to run out"""
+
+    def __init__(self):
+        self.remaining = None  # Requests left in the current window, once a response has reported it
+        self.window_resets_at = 0.0
+        self.paused_until = 0.0
+        self.in_flight = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        """Wait until one more request fits the budget, and count it as in flight while it runs"""
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+            elif self.remaining is not None and self.remaining <= self.in_flight and now < self.window_resets_at:
+                # Requests already out would use up what's left: wait for the window to reset
+                await asyncio.sleep(self.window_resets_at - now)
+            else:
+                break
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    def update(self, response):
+        """Track the budget left in the current rate-limit window"""
+        remaining = response.headers.get("X-Ratelimit-Remaining")
+        reset = response.headers.get("X-Ratelimit-Reset")
+        if remaining is None or reset is None:
+            return
+        self.remaining = float(remaining)
+        self.window_resets_at = time.monotonic() + float(reset)
+
+    def pause(self, seconds):
+        """Hold every request back for `seconds`, e.g. after a 429"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+def retry_after_seconds(response):
+    """Seconds to wait from a 429's Retry-After header"""
+    try:
+        return int(response.headers.get("Retry-After", DEFAULT_RETRY_AFTER))
+    except ValueError:
+        return DEFAULT_RETRY_AFTER
+
+def trim_listing(data):
+    """Keep only the post fields the report reads, so cached listings stay small"""
+    try:
+        children = data.get('data', {}).get('children', [])
+        return {'data': {'children': [
+            {'data': {'subreddit': child['data'].get('subreddit'), 'title': child['data'].get('title')}}
+            for child in children
+        ]}}
+    except (AttributeError, KeyError, TypeError) as e:
+        raise ValueError("Response is not a subreddit listing") from e
+
+async def get_access_token(client):
+    """Client-credentials OAuth token, reused until shortly before it expires; None without credentials"""
+    if not (REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET):
+        return None
+    if _access_token["value"] and time.time() < _access_token["expires_at"]:
+        return _access_token["value"]
+
+    response = await client.post(
+        TOKEN_URL,
+        data={"grant_type": "client_credentials"},
+        auth=(REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET)
+    )
+    if response.status_code != 200:
+        print(f"⚠️ OAuth token request failed ({response.status_code}) - probing anonymously")
+        return None
+    try:
+        token = orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        token = None
+    # Bad grants still come back 200, with an {"error": ...} body instead of a token
+    access_token = token.get("access_token") if isinstance(token, dict) else None
+    if not access_token:
+        error = token.get("error", "no access_token") if isinstance(token, dict) else "non-JSON body"
+        print(f"⚠️ OAuth token request failed ({error}) - probing anonymously")
+        return None
+
+    _access_token["value"] = access_token
+    _access_token["expires_at"] = time.time() + token.get("expires_in", 3600) - TOKEN_EXPIRY_MARGIN
+    return _access_token["value"]
+
+async def fetch_subreddit(client, pacer, cache, subreddit, limit=POSTS_PER_SUBREDDIT, listing_url=LISTING_URL):
+    """Fetch one subreddit's (or a '+'-joined multi-reddit's) newest posts, returning (status, data, cached)"""
+    entry = cache.get(subreddit)
+    if entry and time.time() - entry["fetched_at"] < CACHE_TTL:
+        return 200, entry["data"], True
+
+    url = listing_url.format(subreddit, limit)
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+
+    for attempt in range(MAX_ATTEMPTS):
+        # Stream so non-200 bodies are never downloaded
+        async with pacer.slot(), client.stream("GET", url, headers=headers) as response:
+            pacer.update(response)
+
+            if response.status_code in RETRYABLE_STATUSES and attempt < MAX_ATTEMPTS - 1:
+                if response.status_code == 429:
+                    # Rate limited: hold every probe back for Retry-After
+                    pacer.pause(retry_after_seconds(response))
+                else:
+                    # Server hiccup: back off this probe only, with full jitter
+                    await asyncio.sleep(random.uniform(0, BACKOFF_BASE * 2 ** attempt))
+                continue
+
+            if response.status_code == 304 and entry:
+                # Unchanged since the cached copy: reuse its JSON and restart the TTL
+                entry["fetched_at"] = time.time()
+                cache[subreddit] = entry
+                return 200, entry["data"], True
+
+            if response.status_code != 200:
+                return response.status_code, None, False
+
+            data = trim_listing(orjson.loads(await response.aread()))
+            cache[subreddit] = {
+                "data": data,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched_at": time.time()
+            }
+            return 200, data, False
+
+@dataclass(slots=True)
+class Probe:
+    """One probed listing: a subreddit, or the combined multi-reddit"""
+    subreddit: str
+    status: int | None = None
+    post_count: int = 0
+    sample: str | None = None
+    cached: bool = False
+    error: str | None = None
+
+    @classmethod
+    def from_listing(cls, subreddit, status, data, cached, posts=None):
+        if posts is None:
+            posts = [child['data'] for child in (data or {}).get('data', {}).get('children', [])]
+        sample = posts[0].get('title') if posts else None
+        return cls(subreddit, status, len(posts), sample, cached)
+
+def format_probe(probe):
+    """Human-readable report lines for one probe"""
+    lines = [f"\n🔍 Testing r/{probe.subreddit}"]
+    if probe.error:
+        lines.append(f"   ❌ EXCEPTION - {probe.error}")
+    elif probe.status is not None:
+        lines.append(f"   Status: {probe.status}{' (cached)' if probe.cached else ''}")
+        if probe.status == 200:
+            lines.append(f"   ✅ SUCCESS - Found {probe.post_count} posts")
+            if probe.post_count > 0:
+                lines.append(f"   Sample: {(probe.sample or 'No title')[:50]}...")
+        elif probe.status == 403:
+            lines.append("   ❌ FORBIDDEN - Private or banned")
+        elif probe.status == 404:
+            lines.append("   ❌ NOT FOUND")
+        else:
+            lines.append(f"   ❌ ERROR - {probe.status}")
+    return "\n".join(lines) + "\n"
+
+def first_multireddit_hit(subreddits, data, cached, probes):
+    """Record per-subreddit counts from a combined listing, returning the first subreddit with posts"""
+    posts_by_subreddit = {}
+    for child in data.get('data', {}).get('children', []):
+        post = child['data']
+        posts_by_subreddit.setdefault((post.get('subreddit') or '').lower(), []).append(post)
 
-def test_reddit_access():
-    """Test direct Reddit access to see what subreddits work"""
-    subreddits = ['Python', 'programming', 'technology', 'news', 'pics', 'funny']
-    
     for subreddit in subreddits:
-        url = f"https://www.reddit.com/r/{subreddit}/new.json?limit=5"
-        headers = {"User-Agent": "SentientTracker/1.0 (Game Community Pulse MVP)"}
-        
+        posts = posts_by_subreddit.get(subreddit.lower())
+        if posts:
+            probes.append(Probe.from_listing(subreddit, 200, data, cached, posts=posts))
+            return subreddit
+    return None
+
+async def first_probe_hit(subreddits, tasks, probes):
+    """Record in-flight probes in list order, returning the first working subreddit"""
+    for subreddit, task in zip(subreddits, tasks):
         try:
-            response = requests.get(url, headers=headers, timeout=10)
-            print(f"\n🔍 Testing r/{subreddit}")
-            print(f"   Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                data = response.json()
-                post_count = len(data.get('data', {}).get('children', []))
-                print(f"   ✅ SUCCESS - Found {post_count} posts")
-                if post_count > 0:
-                    first_post = data['data']['children'][0]['data']
-                    print(f"   Sample: {first_post.get('title', 'No title')[:50]}...")
-                return subreddit  # Return first working subreddit
-            elif response.status_code == 403:
-                print(f"   ❌ FORBIDDEN - Private or banned")
-            elif response.status_code == 404:
-                print(f"   ❌ NOT FOUND")
-            else:
-                print(f"   ❌ ERROR - {response.status_code}")
-                
-        except Exception as e:
-            print(f"   ❌ EXCEPTION - {e}")
-    
+            status, data, cached = await task
+        except PROBE_ERRORS as e:
+            probes.append(Probe(subreddit, error=type(e).__name__))
+            continue
+
+        probes.append(Probe.from_listing(subreddit, status, data, cached))
+        if status == 200:
+            return subreddit  # Return first working subreddit
+
     return None
 
+async def probe_reddit_access(probes=None):
+    """Test direct Reddit access to see what subreddits work, recording each probe into `probes`"""
+    if probes is None:
+        probes = []
+    pacer = RateLimitPacer()
+    # HTTP/2 multiplexes every probe over one TLS connection
+    limits = httpx.Limits(max_connections=len(SUBREDDITS), keepalive_expiry=30)
+    with shelve.open(CACHE_PATH) as cache:
+        async with httpx.AsyncClient(http2=True, headers=HEADERS, timeout=TIMEOUT, limits=limits) as client:
+            # Authenticate once up front; every probe then shares the bearer header
+            listing_url = LISTING_URL
+            try:
+                access_token = await get_access_token(client)
+            except httpx.HTTPError as e:
+                print(f"⚠️ OAuth token request failed ({type(e).__name__}) - probing anonymously")
+                access_token = None
+            if access_token:
+                client.headers["Authorization"] = f"Bearer {access_token}"
+                listing_url = OAUTH_LISTING_URL
+
+            # One multi-reddit request covers every subreddit in a single round trip
+            try:
+                status, data, cached = await fetch_subreddit(
+                    client, pacer, cache, MULTIREDDIT,
+                    limit=POSTS_PER_SUBREDDIT * len(SUBREDDITS), listing_url=listing_url
+                )
+                probes.append(Probe.from_listing(MULTIREDDIT, status, data, cached))
+                if status == 200:
+                    working_subreddit = first_multireddit_hit(SUBREDDITS, data, cached, probes)
+                    if working_subreddit:
+                        return working_subreddit
+            except PROBE_ERRORS as e:
+                probes.append(Probe(MULTIREDDIT, error=type(e).__name__))
+
+            # Fall back to probing every subreddit at once; wall time is the slowest RTT, not the sum
+            tasks = [
+                asyncio.create_task(fetch_subreddit(client, pacer, cache, subreddit, listing_url=listing_url))
+                for subreddit in SUBREDDITS
+            ]
+            try:
+                return await first_probe_hit(SUBREDDITS, tasks, probes)
+            finally:
+                # Once the answer is known, drop the probes still in flight
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+def test_reddit_access():
+    """Test direct Reddit access to see what subreddits work"""
+    return asyncio.run(probe_reddit_access())
+
 if __name__ == "__main__":
-    print("🔍 Testing Reddit API Access")
-    print("=" * 30)
-    
-    working_subreddit = test_reddit_access()
-    
+    run = uvloop.run if uvloop else asyncio.run
+    probes = []
+    working_subreddit = run(probe_reddit_access(probes))
+
+    # --json: machine-readable probe records in a single write
+    if "--json" in sys.argv[1:]:
+        sys.stdout.buffer.write(orjson.dumps(probes, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+        sys.exit(0 if working_subreddit else 1)
+
+    report = ["🔍 Testing Reddit API Access\n", "=" * 30 + "\n"]
+    report.extend(format_probe(probe) for probe in probes)
     if working_subreddit:
-        print(f"\n✅ Found working subreddit: r/{working_subreddit}")
-        print("Reddit API access is functional")
+        report.append(f"\n✅ Found working subreddit: r/{working_subreddit}\n")
+        report.append("Reddit API access is functional\n")
     else:
-        print(f"\n⚠️ No accessible subreddits found")
-        print("This may be due to Reddit API restrictions or rate limiting")
\ No newline at end of file
+        report.append("\n⚠️ No accessible subreddits found\n")
+        report.append("This may be due to Reddit API restrictions or rate limiting\n")
+    sys.stdout.write("".join(report))